@@ -0,0 +1,376 @@
+# file: batch.py
+# content: batch simulation of independent lanes
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the batch system runs the same netlist for a number of
+    independent lanes at once. each port state is held by a pair of
+    numpy arrays of unsigned 64 bits integers (value, mask) with one
+    element per lane, in the integer form of the toolbox. the lanes
+    only differ by their initial states and by their rom tables.
+
+    the devices provide their vectorised update with the batch()
+    method. the method returns False when the device can not be
+    batched. in that case, the device update() method is called for
+    each lane in turn on the device ports (this is slow). the devices
+    with a state out of the ports (save_state()) are refused, since
+    the state would be shared by all the lanes.
+
+    like the interpreted engine, a device is only updated when one
+    of its inputs changed in at least one lane on the previous step,
+    and idle time is skipped using next_update().
+
+    each lane can be exported to its own VCD file, and the number of
+    transitions of every port is recorded for every lane.
+'''
+
+from toolbox import *
+from core import logic_device
+from numpy import zeros, uint64, any as np_any, array
+from numpy.random import randint as np_randint
+
+# maximum port width
+_MAX_BITS = 64
+
+######################################################################
+#                                                         BATCH_SYSTEM
+######################################################################
+
+
+class batch_system():
+
+    def __init__(self, system, lanes):
+        # record system and number of lanes
+        self.system, self.lanes = system, lanes
+        # collect devices and ports in tree order
+        self.devices, self.ports, self.index = [], [], {}
+        for d in system.devices: self.collect(d)
+        # the delays are only supported by the logic system
+        if any([x.delay for x in self.devices + self.ports]):
+            raise ValueError("delays are not supported by the batch system")
+        # the multi-valued states are only supported by the logic system
+        M = [d for d in self.devices if d.multi_valued()]
+        M += [p for p in self.ports if p.state and is_multi_valued(p.state)]
+        if M: raise ValueError("multi-valued states are not supported by the batch system")
+        # the device states held out of the ports would be shared by the lanes
+        if any([type(d).save_state is not logic_device.save_state for d in self.devices]):
+            raise ValueError("device states are not supported by the batch system")
+        # collect the dumped ports in export order
+        P = system.get_exported()
+        self.exported = {p: k for k, p in enumerate(P)}
+        # collect time dependent devices
+        self.timed = [d for d in self.devices
+            if type(d).next_update is not logic_device.next_update]
+        # load port states into all lanes
+        self.V, self.M, self.R, self.F = [], [], [], []
+        for p in self.ports:
+            if p.size() > _MAX_BITS:
+                raise ValueError(f"port {p.name} exceeds {_MAX_BITS} bits")
+            v, m = p.get_bits()
+            self.V.append(zeros(lanes, uint64) + v)
+            self.M.append(zeros(lanes, uint64) + m)
+            self.R.append(zeros(lanes, bool) | getattr(p, 'rising', False))
+            self.F.append(zeros(lanes, bool) | getattr(p, 'falling', False))
+        # per lane rom tables
+        self.tables = {}
+        # transitions count
+        self.toggles = [zeros(lanes, int) for p in self.ports]
+        # per lane export files
+        self.files = {}
+        # time and first step updates all devices
+        self.time = system.time
+        self.triggered = dict.fromkeys(self.devices)
+        # done
+        return
+
+    def collect(self, device):
+        # record device
+        self.devices.append(device)
+        # record ports
+        for p in device.inputs + device.outputs:
+            self.index[p] = len(self.ports)
+            self.ports.append(p)
+        # record sub-devices
+        for d in device.devices: self.collect(d)
+        # done
+        return
+
+    ##################################################### LANES
+
+    # set the state of a port in all lanes from integers arrays
+    def set_state(self, port, values, masks = 0):
+        k = self.index[port]
+        self.V[k] = zeros(self.lanes, uint64) + array(values, uint64)
+        self.M[k] = zeros(self.lanes, uint64) + array(masks, uint64)
+        self.V[k] &= ~self.M[k]
+        # done
+        return
+
+    # set random port states in all lanes (the 'R' startup)
+    def randomize(self, port):
+        n = port.size()
+        V = np_randint(0, 1 << min(n, 32), self.lanes, dtype = uint64)
+        if n > 32: V |= np_randint(0, 1 << (n - 32), self.lanes, dtype = uint64) << 32
+        self.set_state(port, V)
+        # done
+        return
+
+    # set a rom table for each lane (same format as the rom table)
+    def set_table(self, device, tables):
+        nn, bits, table = device.configuration
+        TV = zeros((self.lanes, 2**nn), uint64)
+        TM = zeros((self.lanes, 2**nn), uint64)
+        for l, t in enumerate(tables):
+            # pad table with 'U'
+            t += UKN * (bits * 2**nn - len(t))
+            for k in range(2**nn):
+                TV[l, k], TM[l, k] = state_to_bits(t[k*bits:(k+1)*bits])
+        self.tables[device] = TV, TM
+        # done
+        return
+
+    ##################################################### DEVICES
+    # methods used by the device batch() methods
+
+    def get(self, port):
+        k = self.index[port]
+        return self.V[k], self.M[k]
+
+    def set(self, port, value, mask):
+        k = self.index[port]
+        # broadcast to all lanes
+        self.V[k] = zeros(self.lanes, uint64) | value
+        self.M[k] = zeros(self.lanes, uint64) | mask
+        # done
+        return
+
+    def rising(self, port):
+        return self.R[self.index[port]]
+
+    def falling(self, port):
+        return self.F[self.index[port]]
+
+    def concat(self, ports):
+        value, mask, n = 0, 0, 0
+        for p in ports:
+            v, m = self.get(p)
+            value, mask = value | v << n, mask | m << n
+            n += p.size()
+        # done
+        return value, mask, n
+
+    def table(self, device):
+        # per lane table
+        if device in self.tables: return self.tables[device]
+        # shared table
+        nn, bits, table = device.configuration
+        T = [device.read_bits(k) for k in range(2**nn)]
+        TV = array([[v for v, m in T]], uint64)
+        TM = array([[m for v, m in T]], uint64)
+        self.tables[device] = TV, TM
+        # done
+        return TV, TM
+
+    def extract(self, port):
+        v, m = self.get(port.port)
+        ones = uint64((1 << port.size()) - 1)
+        # contiguous subset
+        if port.shift is not None:
+            return (v >> port.shift) & ones, (m >> port.shift) & ones
+        # any other subset
+        V, M = 0, 0
+        for j, k in enumerate(port.subset):
+            V, M = V | ((v >> k) & 1) << j, M | ((m >> k) & 1) << j
+        # done
+        return V, M
+
+    ##################################################### RUN
+
+    def run_until(self, time):
+        while self.time < time:
+            # inputs have changed: compute the next step
+            if self.triggered:
+                self.run_step(self.time + 1)
+                continue
+            # get the next time dependent update
+            W = [d.next_update(self.time) for d in self.timed]
+            W = [w for w in W if w is not None and w > self.time]
+            t = min(W, default = time + 1)
+            if t > time: break
+            self.run_step(t)
+        # nothing can change before 'time'
+        self.time = time
+        # done
+        return
+
+    def run_step(self, time):
+        self.time = time
+        # collect devices triggered by inputs changes
+        active, self.triggered = self.triggered, {}
+        for d in self.timed: active[d] = None
+        # changed lanes of the changed ports
+        changes = {}
+        # update the active devices only
+        for d in active:
+            O = [(o, *self.get(o)) for o in d.outputs]
+            # vectorised update or one lane at a time
+            if not d.batch(self, time): self.update_lanes(d, time)
+            # clear rising and falling flags
+            for i in d.inputs:
+                k = self.index[i]
+                self.R[k] = self.F[k] = zeros(self.lanes, bool)
+            # report changes
+            for o, v, m in O:
+                c = (v != self.V[self.index[o]]) | (m != self.M[self.index[o]])
+                if np_any(c): changes[o] = c
+        # propagate changes to the linked ports
+        P = list(changes)
+        for s in P:
+            for i in s.fanout:
+                k = self.index[i]
+                v, m = self.extract(i)
+                c = (v != self.V[k]) | (m != self.M[k])
+                if not np_any(c): continue
+                # single bit input: compute rising and falling flags
+                if i.size() == 1 and i not in i.parent.outputs:
+                    old = self.V[k] | self.M[k]
+                    self.R[k] = (old == 0) & (v == 1) & (m == 0)
+                    self.F[k] = (self.V[k] == 1) & (self.M[k] == 0) & ((v | m) == 0)
+                self.V[k], self.M[k] = v, m
+                # trigger the port device on the next step
+                self.triggered[i.parent] = None
+                changes[i] = c
+                if i.fanout: P.append(i)
+        # record changes
+        for p, c in changes.items():
+            self.toggles[self.index[p]] += c
+        # export changes
+        if self.files: self.export(changes)
+        # done
+        return
+
+    def update_lanes(self, device, time):
+        P = device.inputs + device.outputs
+        # new output arrays
+        for o in device.outputs:
+            k = self.index[o]
+            self.V[k], self.M[k] = self.V[k].copy(), self.M[k].copy()
+        for l in range(self.lanes):
+            # load the lane states into the ports
+            for p in P:
+                k = self.index[p]
+                p._state, p._bits = None, (int(self.V[k][l]), int(self.M[k][l]))
+                if p.size() > 1: continue
+                if p in device.outputs: continue
+                p.rising, p.falling = bool(self.R[k][l]), bool(self.F[k][l])
+            # update the device
+            device.update(time)
+            # store the lane states
+            for o in device.outputs:
+                k = self.index[o]
+                self.V[k][l], self.M[k][l] = o.get_bits()
+        # done
+        return
+
+    ##################################################### EXPORT
+
+    def open(self, lane, fp):
+        # the time windows are only supported by the logic system
+        if self.system.windows:
+            raise ValueError("time windows are not supported by the batch system")
+        # write the header using the system
+        self.system.open(fp)
+        # register file handle
+        self.files[lane] = self.system.fh
+        self.system.fh = None
+        # write the initial states
+        self.write(lane, {p: None for p in self.exported})
+        # done
+        return
+
+    def export(self, changes):
+        P = sorted([p for p in changes if p in self.exported],
+            key = lambda p: self.exported[p])
+        if not P: return
+        for lane in self.files:
+            self.write(lane, {p: None for p in P if changes[p][lane]})
+        # done
+        return
+
+    def write(self, lane, P):
+        if not P: return
+        export_string = NUL
+        for p in P:
+            k, n = self.index[p], p.size()
+            v, m = int(self.V[k][lane]), int(self.M[k][lane])
+            # make multiple bits case
+            if n > 1:
+                export_string += f"b{bits_to_state(v, m, n)[::-1]} {p.signal}{SPC}"
+                continue
+            # make single bit case
+            export_string += f"{bits_to_state(v, m, 1)}{p.signal}{SPC}"
+        self.files[lane].write(f"#{self.time:04}{SPC}{export_string}{EOL}")
+        # done
+        return
+
+    def close(self):
+        for fh in self.files.values(): fh.close()
+        self.files = {}
+        # done
+        return
+
+    ##################################################### STATISTICS
+
+    def statistics(self):
+        S = {}
+        for p in self.exported:
+            k = self.index[p]
+            T = self.toggles[k]
+            S[f"{p.parent.name}_{p.name}"] = {
+                'toggles_min': int(T.min()),
+                'toggles_max': int(T.max()),
+                'toggles_mean': float(T.mean()),
+                'unknown_lanes': int((self.M[k] != 0).sum()),
+            }
+        # done
+        return S
+
+    def display(self):
+        print(f"<batch system> {self.system.name}")
+        print(f"  lanes {self.lanes}")
+        print(f"  time {self.time}")
+        for name, s in self.statistics().items():
+            print(f"  {name:<20}", end = "")
+            print(f" toggles {s['toggles_min']}..{s['toggles_max']}", end = "")
+            print(f" mean {s['toggles_mean']:.1f}", end = "")
+            print(f" unknown {s['unknown_lanes']}")
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from counter import counter
+    from clock import clock
+    from rom import rom
+
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    cnt = ls.add(counter(2, name = "counter"))
+    cnt.add_clk(clk.Q)
+    mem = ls.add(rom('0110', 1, name = 'mem'))
+    mem.add_address(cnt.Q)
+    bs = batch_system(ls, 16)
+    # random counter startup and rom tables
+    bs.randomize(cnt.Q)
+    bs.set_table(mem, [random_bits(4) for l in range(16)])
+    bs.open(0, "./export0.vcd")
+    bs.open(1, "./export1.vcd")
+    bs.run_until(150)
+    bs.close()
+    bs.display()
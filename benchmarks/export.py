@@ -0,0 +1,146 @@
+# file: export.py
+# content: VCD export throughput
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    measure the throughput of the VCD export in MB/s and in value
+    changes per second for a counter driving 'n' named gates:
+
+    - "direct": the text is written to the file at every step
+      (a writer buffer of one character, like the former export)
+    - "buffer": the text is gathered in the writer buffer
+    - "gzip"  : the text is gathered and compressed with gzip
+
+    the raw writer throughput is measured the same way with lines
+    of value changes written without simulation.
+
+    usage: python benchmarks/export.py [n] [time]
+'''
+
+from sys import path, argv
+from os.path import dirname, realpath, getsize
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from time import perf_counter
+from tempfile import mkdtemp
+from shutil import rmtree
+from gzip import open as gzip_open
+
+######################################################################
+#                                                               SYSTEM
+######################################################################
+
+
+def make_system(n):
+
+    from core import logic_system, logic_port
+    from counter import counter
+    from clock import clock
+    from gate import gate_eor
+
+    # same signal identifiers for all the systems
+    logic_port.signal_counter = 0
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(16, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    for k in range(n):
+        g = ls.add(gate_eor(name = f"g{k}"))
+        g.add_input(cnt.Q, [k % 8])
+        g.add_input(cnt.Q, [(k + 1) % 8])
+    # done
+    return ls
+
+######################################################################
+#                                                              COUNTER
+######################################################################
+# count the value changes of a VCD file (the signals start with 'W')
+
+
+def count_changes(fp):
+    fh = gzip_open(fp, 'rt') if fp.endswith('.gz') else open(fp)
+    n = sum([line.count('W') for line in fh if line[0] == '#'])
+    fh.close()
+    # done
+    return n
+
+######################################################################
+#                                                               EXPORT
+######################################################################
+
+
+def export_throughput(n, time, folder):
+    R = {}
+    for mode, fp, size in [
+            ('direct', 'direct.vcd', 1),
+            ('buffer', 'buffer.vcd', None),
+            ('gzip', 'buffer.vcd.gz', None),
+            ]:
+        fp = f"{folder}/{fp}"
+        ls = make_system(n)
+        ls.open(fp, size)
+        start = perf_counter()
+        ls.run_until(time)
+        ls.close()
+        seconds = perf_counter() - start
+        # text size and changes
+        text, changes = ls.fh.position, count_changes(fp)
+        R[mode] = seconds, text, changes, getsize(fp)
+    # done
+    return R
+
+
+def writer_throughput(lines, folder):
+    from vcd import vcd_writer
+    line = "#1234 b0110100111010011 W2 1W3 0W4 1W5 0W6 1W7 0W8 1W9 "
+    R = {}
+    # direct writes (two per step, like the former export)
+    start = perf_counter()
+    fh = open(f"{folder}/raw.vcd", 'w')
+    for k in range(lines):
+        fh.write(line[:5])
+        fh.write(line[5:] + '\n')
+    fh.close()
+    R['direct'] = perf_counter() - start
+    # buffered writer
+    for mode, fp in [('buffer', 'raw.vcd'), ('gzip', 'raw.vcd.gz')]:
+        start = perf_counter()
+        fh = vcd_writer(f"{folder}/{fp}")
+        for k in range(lines):
+            fh.write(line + '\n')
+        fh.close()
+        R[mode] = perf_counter() - start
+    # done
+    return R, lines * (len(line) + 1), lines * 9
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    n = int(argv[1]) if len(argv) > 1 else 200
+    time = int(argv[2]) if len(argv) > 2 else 20000
+    folder = mkdtemp()
+
+    print(f"export: counter and {n} gates over {time} ns")
+    R = export_throughput(n, time, folder)
+    for mode, (seconds, text, changes, size) in R.items():
+        print(f"  {mode:<8}", end = "")
+        print(f" {seconds:7.3f}s", end = "")
+        print(f" {text / seconds / 1e6:7.2f} MB/s", end = "")
+        print(f" {changes / seconds:10.0f} changes/s", end = "")
+        print(f" {size / 1e6:7.2f} MB on disk")
+
+    print(f"writer: 1000000 lines")
+    R, text, changes = writer_throughput(1000000, folder)
+    for mode, seconds in R.items():
+        print(f"  {mode:<8}", end = "")
+        print(f" {seconds:7.3f}s", end = "")
+        print(f" {text / seconds / 1e6:7.2f} MB/s", end = "")
+        print(f" {changes / seconds:10.0f} changes/s")
+
+    rmtree(folder)
@@ -0,0 +1,88 @@
+# file: gates.py
+# content: gate evaluation cost against the bus width
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    measure the cost of one update of two inputs gates for bus widths
+    from 1 to 64 bits with three evaluations of the same inputs:
+
+    - "lut"   : the string form lut() (one parse per bit)
+    - "table" : the integer form lut_bits() (one term per table row)
+    - "native": the gate update (the bitwise evaluate() of the gate)
+
+    the costs are given in ns per update and in ns per bit.
+
+    usage: python benchmarks/gates.py [updates]
+'''
+
+from sys import path, argv
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from time import perf_counter
+from random import getrandbits
+
+######################################################################
+#                                                                 GATE
+######################################################################
+
+
+def gate_cost(kind, bits, updates):
+
+    from core import logic_device
+    from toolbox import lut, lut_bits, bits_to_state
+
+    # two sources driving the gate inputs
+    source = logic_device()
+    A = source.add_output_port(bits, "A", None, None, '0')
+    B = source.add_output_port(bits, "B", None, None, '0')
+    g = kind(bits)
+    g.add_input(A)
+    g.add_input(B)
+    I = g.inputs
+    # random input values
+    V = [(getrandbits(bits), getrandbits(bits)) for k in range(64)]
+    S = [(bits_to_state(a, 0, bits), bits_to_state(b, 0, bits)) for a, b in V]
+    R = {}
+    # string form
+    start = perf_counter()
+    for k in range(updates):
+        a, b = S[k & 63]
+        lut(g.table, a, b)
+    R['lut'] = perf_counter() - start
+    # integer form
+    start = perf_counter()
+    for k in range(updates):
+        a, b = V[k & 63]
+        lut_bits(g.table, bits, (a, 0), (b, 0))
+    R['table'] = perf_counter() - start
+    # gate update
+    start = perf_counter()
+    for k in range(updates):
+        a, b = V[k & 63]
+        I[0]._bits, I[1]._bits = (a, 0), (b, 0)
+        g.update(0)
+    R['native'] = perf_counter() - start
+    # done (ns per update)
+    return {mode: t / updates * 1e9 for mode, t in R.items()}
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from gate import gate_and, gate_or, gate_eor, gate_nand, gate_nor, gate_equ
+
+    updates = int(argv[1]) if len(argv) > 1 else 20000
+
+    print(f"ns per update (ns per bit) over {updates} updates")
+    print(f"{'gate':<10}{'bits':>5}{'lut':>18}{'table':>18}{'native':>18}")
+    for kind in [gate_and, gate_or, gate_eor, gate_nand, gate_nor, gate_equ]:
+        for bits in [1, 8, 16, 32, 64]:
+            R = gate_cost(kind, bits, updates)
+            print(f"{kind.__name__:<10}{bits:>5}", end = "")
+            for mode in ['lut', 'table', 'native']:
+                print(f"{R[mode]:>10.0f} ({R[mode] / bits:>5.1f})", end = "")
+            print()
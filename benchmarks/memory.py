@@ -0,0 +1,58 @@
+# file: memory.py
+# content: memory used per gate
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    build a system of 'n' two inputs AND gates fed by a counter and
+    measure the memory allocated per gate with tracemalloc. the gates
+    are named so that every port is exported, like in a real design.
+
+    usage: python benchmarks/memory.py [n]
+'''
+
+from sys import path, argv
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from tracemalloc import start, stop, take_snapshot
+from gc import collect
+
+######################################################################
+#                                                               MEMORY
+######################################################################
+
+
+def bytes_per_gate(n):
+
+    from core import logic_system
+    from counter import counter
+    from clock import clock
+    from gate import gate_and
+
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    cnt = ls.add(counter(16, name = "counter"))
+    cnt.add_clk(clk.Q)
+    # measure the gates only
+    collect()
+    start()
+    before = sum([s.size for s in take_snapshot().statistics('filename')])
+    for k in range(n):
+        g = ls.add(gate_and(name = f"g{k}"))
+        g.add_input(cnt.Q, [k % 16])
+        g.add_input(cnt.Q, [(k + 1) % 16])
+    collect()
+    after = sum([s.size for s in take_snapshot().statistics('filename')])
+    stop()
+    # done
+    return (after - before) / n
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    n = int(argv[1]) if len(argv) > 1 else 10000
+    print(f"{bytes_per_gate(n):.0f} bytes per gate ({n} gates)")
@@ -0,0 +1,288 @@
+# file: suite.py
+# content: benchmark suite of synthetic circuits
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    build parameterized designs from the existing devices, run them
+    for a fixed simulated time and measure:
+
+    - "ns/s"    : simulated ns per wall second
+    - "events/s": value changes per wall second (every port is
+                  named, the changes are counted in the VCD file)
+    - "peak"    : peak resident memory of the process in MB
+    - "vcd"     : size of the VCD file in bytes
+
+    the designs are:
+
+    - "ripple"  : chains of 4 bits counters, each one clocked by the
+                  inverted last bit of the previous one
+    - "gates"   : deep chain of and/or/eor/nand gates fed by a clock
+                  and by the bits of a counter
+    - "mux"     : tree of four inputs multiplexers selecting the bits
+                  of a counter with the bits of a second counter
+    - "rom"     : ROMs addressed by a counter
+    - "pipeline": chain of registers fed by a counter
+
+    the sizes of the designs are fixed so that the results can be
+    compared between runs: each design is built and run in its own
+    (forked) process with the "run_step" engine (the logic system
+    run_until() baseline) and the "compiled" engine. the results can
+    be saved in a JSON file and compared with a previous file.
+
+    usage: python benchmarks/suite.py [time] [results.json [baseline.json]]
+'''
+
+from sys import path, argv
+from os.path import dirname, realpath, getsize
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from time import perf_counter
+from tempfile import mkdtemp
+from shutil import rmtree
+from resource import getrusage, RUSAGE_SELF
+from multiprocessing import get_context
+from json import dump, load
+
+######################################################################
+#                                                              DESIGNS
+######################################################################
+# each design returns a logic system with all the devices named
+
+
+def _system():
+
+    from core import logic_system, logic_port
+    from clock import clock
+
+    # same signal identifiers for all the runs
+    logic_port.signal_counter = 0
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    # done
+    return ls, clk, rst
+
+
+def ripple(chains = 32, n = 8):
+
+    from counter import counter
+    from gate import gate_not
+
+    ls, clk, rst = _system()
+    for j in range(chains):
+        q = clk.Q
+        for k in range(n):
+            c = ls.add(counter(4, name = f"counter{j}_{k}"))
+            c.add_clk(q)
+            c.add_clr(rst.Q)
+            g = ls.add(gate_not(name = f"not{j}_{k}"))
+            g.add_input(c.Q, [3])
+            q = g.Q
+    # done
+    return ls
+
+
+def gates(n = 1000):
+
+    from counter import counter
+    from gate import gate_and, gate_or, gate_eor, gate_nand
+
+    ls, clk, rst = _system()
+    cnt = ls.add(counter(8, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    q = clk.Q
+    for k in range(n):
+        kind = [gate_eor, gate_or, gate_nand, gate_and][k % 4]
+        g = ls.add(kind(name = f"g{k}"))
+        g.add_input(q)
+        g.add_input(cnt.Q, [k % 8])
+        q = g.Q
+    # done
+    return ls
+
+
+def mux(depth = 5, bits = 8):
+
+    from counter import counter
+    from multiplexer import multiplexer
+
+    ls, clk, rst = _system()
+    data = ls.add(counter(16, name = "data"))
+    data.add_clk(clk.Q)
+    data.add_clr(rst.Q)
+    select = ls.add(counter(2 * depth, name = "select"))
+    select.add_clk(clk.Q)
+    select.add_clr(rst.Q)
+    # build the tree from the root
+    leaves = []
+    def node(level):
+        m = ls.add(multiplexer(bits, name = f"mux{len(ls.devices)}"))
+        m.add_S(select.Q, [2 * level])
+        m.add_S(select.Q, [2 * level + 1])
+        for j in range(4):
+            if level: m.add_A(node(level - 1).Q)
+            else:
+                k = len(leaves)
+                leaves.append(k)
+                m.add_A(data.Q, [(k + i) % 16 for i in range(bits)])
+        return m
+    node(depth - 1)
+    # done
+    return ls
+
+
+def rom_lookup(n = 16, address = 8, bits = 8):
+
+    from counter import counter
+    from rom import rom
+
+    ls, clk, rst = _system()
+    cnt = ls.add(counter(address, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    for k in range(n):
+        # deterministic tables
+        words = [(a * (2 * k + 3) + k) % (1 << bits) for a in range(1 << address)]
+        table = "".join([f"{w:0{bits}b}"[::-1] for w in words])
+        r = ls.add(rom(table, bits, name = f"rom{k}"))
+        r.add_address(cnt.Q)
+    # done
+    return ls
+
+
+def pipeline(n = 64, bits = 16):
+
+    from counter import counter
+    from register import register
+
+    ls, clk, rst = _system()
+    cnt = ls.add(counter(bits, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    q = cnt.Q
+    for k in range(n):
+        r = ls.add(register(bits, name = f"register{k}"))
+        r.add_input(q)
+        r.add_clk(clk.Q)
+        r.add_clr(rst.Q)
+        q = r.Q
+    # done
+    return ls
+
+
+DESIGNS = {
+    'ripple': ripple,
+    'gates': gates,
+    'mux': mux,
+    'rom': rom_lookup,
+    'pipeline': pipeline,
+    }
+
+ENGINES = ['run_step', 'compiled']
+
+######################################################################
+#                                                                  RUN
+######################################################################
+
+
+def run(design, engine, time, folder):
+
+    from vcd import vcd_reader
+
+    ls = DESIGNS[design]()
+    fp = f"{folder}/{design}_{engine}.vcd"
+    # compile before the measure
+    if engine == 'compiled':
+        from compiler import compiled_system
+        cs = compiled_system(ls)
+    else: cs = ls
+    ls.open(fp)
+    start = perf_counter()
+    cs.run_until(time)
+    ls.close()
+    seconds = perf_counter() - start
+    # count the value changes
+    fh = vcd_reader(fp)
+    changes = sum([len(C) for t, C in fh.steps()])
+    fh.close()
+    # done
+    return {
+        'design': design,
+        'engine': engine,
+        'devices': len(ls.get_devices()) - 1,
+        'time': time,
+        'seconds': seconds,
+        'ns/s': time / seconds,
+        'events/s': changes / seconds,
+        'peak': getrusage(RUSAGE_SELF).ru_maxrss / 1024,
+        'vcd': getsize(fp),
+        }
+
+
+def _worker(pipe, design, engine, time, folder):
+    try: pipe.send(run(design, engine, time, folder))
+    except Exception as e: pipe.send(e)
+    pipe.close()
+    # done
+    return
+
+
+# run each design and engine in its own process
+def suite(time = 20000, designs = None, engines = None):
+    folder, R = mkdtemp(), []
+    context = get_context('fork')
+    for design in designs or DESIGNS:
+        for engine in engines or ENGINES:
+            a, b = context.Pipe()
+            w = context.Process(target = _worker,
+                args = (b, design, engine, time, folder))
+            w.start()
+            r = a.recv()
+            w.join()
+            # record the failures (e.g. a design not compiled)
+            if isinstance(r, Exception):
+                r = {'design': design, 'engine': engine, 'error': str(r)}
+            R.append(r)
+    rmtree(folder)
+    # done
+    return R
+
+
+def display(R, baseline = None):
+    # index the baseline results
+    B = {(r['design'], r['engine']): r for r in baseline or []}
+    print(f"{'design':<10}{'engine':<10}{'devices':>8}{'seconds':>9}"
+        f"{'ns/s':>11}{'events/s':>11}{'peak MB':>9}{'vcd bytes':>11}"
+        f"{'speedup':>9}")
+    for r in R:
+        print(f"{r['design']:<10}{r['engine']:<10}", end = "")
+        if 'error' in r:
+            print(f"  {r['error']}")
+            continue
+        print(f"{r['devices']:>8}{r['seconds']:>9.3f}{r['ns/s']:>11.0f}"
+            f"{r['events/s']:>11.0f}{r['peak']:>9.1f}{r['vcd']:>11}", end = "")
+        # compare with the baseline
+        b = B.get((r['design'], r['engine']), {})
+        print(f"{r['ns/s'] / b['ns/s']:>9.2f}" if 'ns/s' in b else "")
+    # done
+    return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    time = int(argv[1]) if len(argv) > 1 else 20000
+    baseline = None
+    if len(argv) > 3:
+        with open(argv[3]) as fh: baseline = load(fh)
+
+    print(f"suite: {time} ns")
+    R = suite(time)
+    display(R, baseline)
+
+    if len(argv) > 2:
+        with open(argv[2], 'w') as fh: dump(R, fh, indent = 1)
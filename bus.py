@@ -0,0 +1,182 @@
+# file: bus.py
+# content: tri-state buffer and shared bus
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the shared bus resolves the states of several drivers into one
+    state using the resolution table of the nine-valued logic (see
+    toolbox.py): a driver in high impedance 'Z' leaves the bus to
+    the other drivers, two strong drivers in conflict give 'X', a
+    strong level wins over a weak level 'L', 'H' or 'W'. a bus
+    without any active driver floats in 'Z'.
+
+    the tri-state buffer drives its data inputs on its output when
+    the enable input is high and releases the output in 'Z' when
+    the enable input is low.
+
+    the multi-valued states are only held by the string form of the
+    ports: the compiled, batched and partitioned engines refuse these
+    devices (see logic_device.multi_valued()).
+'''
+
+from toolbox import *
+from core import logic_device
+
+######################################################################
+###                                                           TRISTATE
+######################################################################
+
+class tristate(logic_device):
+
+    E = None
+
+    def __init__(self, bits = 1, name = None, behav = 'Z'):
+        # call Device class constructor
+        logic_device.__init__(self, name)
+        # record configuration
+        self.configuration = bits
+        # instantiate output port
+        self.Q = self.add_output_port(bits, "Q", None, None, behav)
+        # declare data input list
+        self.A = []
+        # done
+        return
+
+    def add_input(self, port, subset = None):
+        self.A.append(self.add_input_port(port, "A", subset))
+        # done
+        return
+
+    def add_enable(self, port, subset = None):
+        self.E = self.add_input_port(port, "E", subset)
+        # done
+        return
+
+    def update(self, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # get enable state (weak levels are read as 0 and 1)
+        e = self.E.get() if self.E else HGH
+        e = {WLO: LOW, WHI: HGH}.get(e, e)
+        # release the bus
+        if e == LOW:
+            self.Q.set(HIZ * bits)
+            return
+        # drive the bus
+        if e == HGH:
+            self.Q.set(NUL.join([a.get() for a in self.A]))
+            return
+        # uninitialised or unknown enable
+        self.Q.set((UKN if e == UKN else CNF) * bits)
+        # done
+        return
+
+    def multi_valued(self):
+        return True
+
+    def display(self, tab = None):
+        # get name
+        name = self.name
+        # get configuration
+        bits = self.configuration
+        # get current values
+        value = f'Q={self.Q.get()[::-1]}'
+        # display
+        print(f"<tristate> {name}")
+        print(f"  bits {bits}")
+        print(f"  value {value}")
+        # done
+        return
+
+######################################################################
+###                                                                BUS
+######################################################################
+
+class bus(logic_device):
+
+    def __init__(self, bits = 1, name = None, behav = 'Z'):
+        # call Device class constructor
+        logic_device.__init__(self, name)
+        # record configuration
+        self.configuration = bits
+        # instantiate output port
+        self.Q = self.add_output_port(bits, "Q", None, None, behav)
+        # done
+        return
+
+    def add_driver(self, port, subset = None):
+        i = self.add_input_port(port, "A", subset)
+        # display width mismatch warning
+        ni, no = i.size(), self.Q.size()
+        if not ni == no:
+            print(f"  width mismatch warning:")
+            print(f"    {no} bit(s) expected from output width,")
+            print(f"    {ni} bit(s) found for driver {i.name}.")
+        # done
+        return
+
+    def update(self, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # collect drivers states
+        S = [i.get() for i in self.inputs]
+        # resolve bus state
+        self.Q.set(resolve(*S) if S else HIZ * bits)
+        # done
+        return
+
+    def multi_valued(self):
+        return True
+
+    def display(self, tab = None):
+        # get name
+        name = self.name
+        # get configuration
+        bits = self.configuration
+        # get current values
+        value = f'Q={self.Q.get()[::-1]}'
+        # display
+        print(f"<bus> {name}")
+        print(f"  bits {bits}")
+        print(f"  drivers {len(self.inputs)}")
+        print(f"  value {value}")
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+    from gate import gate_not, gate_and
+
+    ls = logic_system()
+    rst = ls.add(clock(20, 15, 5, 1, name = 'reset'))
+    clk = ls.add(clock(name = 'clock'))
+    cnt = ls.add(counter(4, name = 'counter'))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    # two drivers enabled by the counter bits 2 and 3
+    b1 = ls.add(tristate(2, name = 'driver'))
+    b1.add_input(cnt.Q, [0, 1])
+    b1.add_enable(cnt.Q, [2])
+    b2 = ls.add(tristate(2, name = 'driver'))
+    b2.add_input(cnt.Q, [1, 0])
+    b2.add_enable(cnt.Q, [3])
+    # shared bus: 'Z', single driver or conflict
+    db = ls.add(bus(2, name = 'bus'))
+    db.add_driver(b1.Q)
+    db.add_driver(b2.Q)
+    # gate reading the bus
+    g = ls.add(gate_and(name = 'AND'))
+    g.add_input(db.Q, [0])
+    g.add_input(db.Q, [1])
+    ls.display()
+    ls.open("./export.vcd")
+    ls.run_until(400)
+    ls.close()
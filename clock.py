@@ -23,6 +23,11 @@
     'count' parameter means that the number of pulses in unlimited.
     the clock signal is defined at 0 ns and has its level set on
     creation before the start of the simulation.
+
+    the clock reports the time of its next edge to the system, so
+    that the simulation skips the idle time between the edges. the
+    last pulse of a finite train ends with its falling edge, unless
+    the falling edge is at the end of the train.
 '''
 
 from toolbox import *
@@ -77,6 +82,52 @@ class clock(logic_device):
         # done
         return
 
+    def compile(self, c):
+        # get configuration
+        period, width, shift, count = self.configuration
+        # get output names
+        v, m = c.v(self.Q), c.m(self.Q)
+        # unlimited pulse train
+        if count is None:
+            c.emit(f"{v}, {m} = int((t - {shift}) % {period} < {width}), 0")
+            return True
+        # pulse train completed
+        c.emit(f"if {count * period} > t:")
+        c.emit(f"    {v}, {m} = int((t - {shift}) % {period} < {width}), 0")
+        # done
+        return True
+
+    def batch(self, b, timeStamp):
+        # get configuration
+        period, width, shift, count = self.configuration
+        # compute phase
+        phase = (timeStamp - shift) % period
+        # pulse train completed
+        if count is not None:
+            if not count * period > timeStamp:
+                return True
+        # update outputs values in all lanes
+        b.set(self.Q, int(phase < width), 0)
+        # done
+        return True
+
+    def next_update(self, timeStamp):
+        # get configuration
+        period, width, shift, count = self.configuration
+        # constant output
+        if width <= 0 or width >= period: return None
+        # compute phase
+        phase = (timeStamp - shift) % period
+        # next falling edge (high) or next rising edge (low)
+        if phase < width: t = timeStamp + width - phase
+        else: t = timeStamp + period - phase
+        # pulse train completed
+        if count is not None:
+            if not count * period > t:
+                return None
+        # done
+        return t
+
     def display(self, tab):
         # get name
         name = self.name
@@ -0,0 +1,457 @@
+# file: compiler.py
+# content: netlist compiler
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the compiler turns a logic system into one python function that
+    runs the whole netlist with local variables: each port state is
+    held by a pair of integers (value, mask) in the integer form of
+    the toolbox, and each device is replaced by a few lines of code.
+
+    the devices provide their own code with the compile() method.
+    the method returns False when the device can not be compiled.
+    in that case, the compiled function calls the device update()
+    method directly on the device ports (the 'interpreted' devices).
+
+    the devices are sorted by levels: the sources (clocks) are at
+    level 0 and any other device is one level above the devices
+    which output ports drive its ports. the output ports linked to
+    the output of a sub-device follow it in the same step, like in
+    the interpreted engine. the loops are broken at the sequential
+    devices. since every device output is computed from the inputs
+    latched at the previous ns, the results do not depend on the
+    order of the other devices: their levels only fix a readable
+    order.
+
+    the compiled function writes the same VCD as the interpreted
+    engine. the compiled run can be mixed with interpreted runs:
+    the port states are loaded from the system before the run and
+    stored back into the system afterwards.
+
+    on the designs of the benchmark suite (see benchmarks/suite.py)
+    the compiled function runs 3 to 8 times faster than the
+    interpreted engine, short of an order of magnitude: the
+    interpreted engine also works on the integer form and only
+    updates the triggered devices, and both engines format every
+    exported change, which dominates the designs with many changes.
+'''
+
+from toolbox import *
+from core import logic_device
+
+######################################################################
+#                                                      COMPILED_SYSTEM
+######################################################################
+
+
+class compiled_system():
+
+    def __init__(self, system):
+        # record system
+        self.system = system
+        # collect devices and ports in tree order
+        self.devices, self.ports, self.index = [], [], {}
+        for d in system.devices: self.collect(d)
+        # the delays are only supported by the logic system
+        if any([x.delay for x in self.devices + self.ports]):
+            raise ValueError("delays are not supported by the compiler")
+        # the multi-valued states are only supported by the logic system
+        M = [d for d in self.devices if d.multi_valued()]
+        M += [p for p in self.ports if p.state and is_multi_valued(p.state)]
+        if M: raise ValueError("multi-valued states are not supported by the compiler")
+        # sort devices by levels
+        self.levels = self.make_levels()
+        # build the function source
+        self.constants, self.interpreted, self.timed = {}, [], []
+        self.lines = []
+        self.make_source()
+        self.source = EOL.join(self.lines) + EOL
+        # build the function
+        namespace = dict(self.constants)
+        namespace['bits_to_state'] = bits_to_state
+        exec(compile(self.source, f"<{system.name}>", 'exec'), namespace)
+        self.function = namespace['run']
+        # done
+        return
+
+    def collect(self, device):
+        # record device
+        self.devices.append(device)
+        # record ports
+        for p in device.inputs + device.outputs:
+            self.index[p] = len(self.ports)
+            self.ports.append(p)
+        # record sub-devices
+        for d in device.devices: self.collect(d)
+        # done
+        return
+
+    ##################################################### NAMES
+
+    # local names of the port value and mask
+    def v(self, port):
+        return f"v{self.index[port]}"
+
+    def m(self, port):
+        return f"m{self.index[port]}"
+
+    # local names of the port rising and falling flags
+    def r(self, port):
+        return f"r{self.index[port]}"
+
+    def f(self, port):
+        return f"f{self.index[port]}"
+
+    # global name of a constant
+    def const(self, value):
+        name = f"K{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    # local name of a device temporary variable
+    def tmp(self, device, name):
+        return f"{name}_{self.number[device]}"
+
+    def emit(self, line):
+        self.lines.append(f"{TAB*self.indent}{line}")
+        # done
+        return
+
+    ##################################################### HELPERS
+
+    # expression of the concatenation of ports (lsb first)
+    def concat(self, ports):
+        V, M, n = [], [], 0
+        for p in ports:
+            V.append(f"{self.v(p)} << {n}" if n else self.v(p))
+            M.append(f"{self.m(p)} << {n}" if n else self.m(p))
+            n += p.size()
+        # done
+        return f"({' | '.join(V)})", f"({' | '.join(M)})", n
+
+    # expression of a table (see lut_bits) as a sum of minterms
+    def minterms(self, table, V, bits):
+        ones, T = (1 << bits) - 1, []
+        for k, t in enumerate(table):
+            if t == LOW: continue
+            # only '0' and '1' tables are compiled
+            if not t == HGH: return None
+            F = [v if (k >> j) & 1 else f"~{v}" for j, v in enumerate(V)]
+            T.append(f"({' & '.join(F)})")
+        # constant low
+        if not T: return "0"
+        # done
+        return f"(({' | '.join(T)}) & {ones})"
+
+    # the width of the output ports of the interpreted devices can
+    # change at run time (the gates with mismatched inputs)
+    def dynamic(self, port):
+        return port.parent in self.interpreted and port in port.parent.outputs
+
+    # expression of the subset of the target of a linked port
+    def extract(self, port):
+        v, m = self.v(port.port), self.m(port.port)
+        n, ones = port.size(), (1 << port.size()) - 1
+        # contiguous subset
+        if port.shift is not None:
+            if port.shift: v, m = f"({v} >> {port.shift})", f"({m} >> {port.shift})"
+            if self.dynamic(port.port): return f"({v} & {ones})", f"({m} & {ones})"
+            if port.shift + n == port.port.size(): return v, m
+            return f"({v} & {ones})", f"({m} & {ones})"
+        # any other subset
+        V = [f"(({v} >> {k}) & 1) << {j}" for j, k in enumerate(port.subset)]
+        M = [f"(({m} >> {k}) & 1) << {j}" for j, k in enumerate(port.subset)]
+        return f"({' | '.join(V)})", f"({' | '.join(M)})"
+
+    ##################################################### LEVELS
+
+    def make_levels(self):
+        # build the drivers of each device
+        drivers = {d: [] for d in self.devices}
+        for d in self.devices:
+            for p in d.inputs + d.outputs:
+                if p.port is None: continue
+                if p.port.parent is d: continue
+                # the input ports are updated in the input phase
+                if p.port not in p.port.parent.outputs: continue
+                if p.port.parent not in drivers: continue
+                drivers[d].append(p.port.parent)
+        # compute levels by a depth first search (a loop gets the
+        # level of its entry point)
+        levels = {}
+        for d in self.devices:
+            if d in levels: continue
+            stack, path = [(d, iter(drivers[d]))], {d}
+            while stack:
+                device, D = stack[-1]
+                # get the level of all the drivers first
+                for x in D:
+                    if x in levels or x in path: continue
+                    stack.append((x, iter(drivers[x])))
+                    path.add(x)
+                    break
+                # all drivers done
+                else:
+                    stack.pop()
+                    path.discard(device)
+                    L = [levels.get(x, -1) for x in drivers[device]]
+                    levels[device] = max(L, default = -1) + 1
+        # sort devices by levels, keeping the tree order
+        self.devices.sort(key = lambda d: levels[d])
+        # number devices
+        self.number = {d: k for k, d in enumerate(self.devices)}
+        # done
+        return levels
+
+    ##################################################### SOURCE
+
+    def make_source(self):
+        # collect the dumped ports in export order
+        P = self.system.get_exported()
+        self.exported = {p: k for k, p in enumerate(P)}
+        # function header
+        self.indent = 1
+        self.lines.append(f"def run(t, T, S, P, D, write):")
+        # load the port states
+        for p in self.ports:
+            k = self.index[p]
+            self.emit(f"v{k}, m{k}, r{k}, f{k} = S[{k}]")
+            if p.fanout: self.emit(f"c{k} = 0")
+        # the first step updates all devices
+        for d in self.devices:
+            self.emit(f"e{self.number[d]} = 1")
+        # changes of the step (one list for the whole run)
+        self.emit(f"C = []")
+        # time loop
+        self.emit(f"while t < T:")
+        self.indent = 2
+        self.emit(f"t += 1")
+        self.emit(f"busy = 0")
+        # output phase
+        for d in self.devices: self.make_device(d)
+        # input phase
+        self.emit(f"# inputs")
+        for p in self.ports:
+            if not p.fanout: continue
+            self.make_fanout(p)
+        # export phase
+        self.emit(f"# export")
+        self.emit(f"if C:")
+        self.emit(f"    C.sort()")
+        self.emit(f"    write(f'#{{t:04}} {{NUL.join([c for n, c in C])}}{{EOL}}')")
+        self.emit(f"    C.clear()")
+        # skip idle time up to the next time dependent update
+        self.emit(f"# skip idle time")
+        self.emit(f"if busy: continue")
+        W = [f"D[{self.number[d]}].next_update(t)" for d in self.timed]
+        self.emit(f"W = [w for w in ({', '.join(W + [''])}) if w]")
+        self.emit(f"t = max(t, min(W + [T + 1]) - 1)")
+        # return the port states
+        self.indent = 1
+        S = [f"(v{k}, m{k}, r{k}, f{k})" for k in range(len(self.ports))]
+        self.emit(f"return [{', '.join(S)}]")
+        # symbols
+        self.constants['NUL'], self.constants['EOL'] = NUL, EOL
+        # done
+        return
+
+    def make_device(self, device):
+        k = self.number[device]
+        self.emit(f"# {type(device).__name__} {device.name} (level {self.levels[device]})")
+        # the linked output ports follow their source in the same step
+        # (the source device has a lower level)
+        for o in device.outputs:
+            if o.port is None: continue
+            self.make_linked(o)
+        # time dependent devices are updated on every step
+        timed = type(device).next_update is not logic_device.next_update
+        if timed:
+            self.timed.append(device)
+        else:
+            self.emit(f"if e{k}:")
+            self.indent += 1
+            self.emit(f"e{k} = 0")
+        # record output states
+        O = [o for o in device.outputs]
+        for o in O:
+            self.emit(f"a{self.index[o]}, b{self.index[o]} = {self.v(o)}, {self.m(o)}")
+        # device specific code or interpreted device
+        if not device.compile(self): self.make_interpreted(device)
+        # clear rising and falling flags
+        for i in device.inputs:
+            if not i.size() == 1: continue
+            self.emit(f"{self.r(i)} = {self.f(i)} = False")
+        # report changes
+        for o in O:
+            n = self.index[o]
+            self.emit(f"if not ({self.v(o)} == a{n} and {self.m(o)} == b{n}):")
+            self.indent += 1
+            if o.fanout: self.emit(f"c{n} = 1")
+            self.make_export_port(o)
+            if not (o.fanout or o in self.exported): self.emit(f"pass")
+            self.indent -= 1
+        # done
+        if not timed: self.indent -= 1
+        return
+
+    def make_interpreted(self, device):
+        self.interpreted.append(device)
+        k = self.number[device]
+        # store the port states into the ports
+        for p in device.inputs + device.outputs:
+            n = self.index[p]
+            self.emit(f"p = P[{n}]; p._state, p._bits = None, (v{n}, m{n})")
+            if p.size() > 1: continue
+            if p in device.outputs: continue
+            self.emit(f"p.rising, p.falling = r{n}, f{n}")
+        # call the device
+        self.emit(f"D[{k}].update(t)")
+        # load the output states from the ports
+        for o in device.outputs:
+            n = self.index[o]
+            self.emit(f"v{n}, m{n} = P[{n}].get_bits()")
+        # done
+        return
+
+    def make_linked(self, port):
+        v, m = self.v(port), self.m(port)
+        self.emit(f"a, b = {self.extract(port)[0]}, {self.extract(port)[1]}")
+        self.emit(f"if not (a == {v} and b == {m}):")
+        self.indent += 1
+        self.emit(f"{v}, {m} = a, b")
+        if port.fanout: self.emit(f"c{self.index[port]} = 1")
+        self.make_export_port(port)
+        self.indent -= 1
+        # done
+        return
+
+    def make_fanout(self, port):
+        self.emit(f"if c{self.index[port]}:")
+        self.indent += 1
+        self.emit(f"c{self.index[port]} = 0")
+        # update all linked input ports
+        for i in port.fanout:
+            if i in i.parent.outputs: continue
+            v, m = self.v(i), self.m(i)
+            self.emit(f"a, b = {self.extract(i)[0]}, {self.extract(i)[1]}")
+            self.emit(f"if not (a == {v} and b == {m}):")
+            self.indent += 1
+            # single bit input: compute rising and falling flags
+            if i.size() == 1:
+                self.emit(f"{self.r(i)} = not ({v} | {m} | b) and a == 1")
+                self.emit(f"{self.f(i)} = not ({m} | b | a) and {v} == 1")
+            self.emit(f"{v}, {m} = a, b")
+            # trigger the port device on the next step
+            self.emit(f"e{self.number[i.parent]} = busy = 1")
+            if i.fanout: self.emit(f"c{self.index[i]} = 1")
+            self.make_export_port(i)
+            self.indent -= 1
+        self.indent -= 1
+        # done
+        return
+
+    def make_export_port(self, port):
+        # not exported
+        if port not in self.exported: return
+        k, n, x = self.index[port], port.size(), self.exported[port]
+        # run time width
+        if self.dynamic(port):
+            state = f"bits_to_state(v{k}, m{k}, n)[::-1]"
+            bit = f"\"U\" if m{k} else v{k}"
+            self.emit(f"n = P[{k}].width")
+            self.emit(f"C.append(({x}, f'b{{{state}}} {port.signal} ' if n > 1 else f'{{{bit}}}{port.signal} '))")
+            return
+        # make multiple bits case (the known bits are formatted at once)
+        if n > 1:
+            state = f"bits_to_state(v{k}, m{k}, {n})[::-1]"
+            self.emit(f"C.append(({x}, f'b{{{state}}} {port.signal} ' if m{k} else f'b{{v{k}:0{n}b}} {port.signal} '))")
+            return
+        # make single bit case (constant strings)
+        s = port.signal
+        self.emit(f"C.append(({x}, 'U{s} ' if m{k} else '1{s} ' if v{k} else '0{s} '))")
+        # done
+        return
+
+    ##################################################### RUN
+
+    def run_until(self, time):
+        ls = self.system
+        # nothing to do
+        if not ls.time < time: return
+        # the time windows are only supported by the logic system
+        if ls.windows:
+            raise ValueError("time windows are not supported by the compiler")
+        # export the pending changes
+        ls.export()
+        # load port states
+        S = []
+        for p in self.ports:
+            v, m = p.get_bits()
+            # the multi-valued states are only held by the string form
+            if p._bits is None:
+                raise ValueError("multi-valued states are not supported by the compiler")
+            S.append((v, m,
+                getattr(p, 'rising', False),
+                getattr(p, 'falling', False)))
+        # run
+        S = self.function(ls.time, time, S,
+            self.ports, self.devices, ls.fh.write)
+        # store port states
+        for p, (v, m, r, f) in zip(self.ports, S):
+            p._state, p._bits, p.up_to_date = None, (v, m), True
+            if p.size() > 1: continue
+            if p.port is None: continue
+            p.rising, p.falling = r, f
+        ls.time = time
+        # restart the scheduler with a full step
+        if ls.triggered is None: ls.link()
+        ls.events.clear()
+        ls.dirty.clear()
+        ls.triggered = dict.fromkeys(ls.devices)
+        ls.settle[:] = [p for p in self.ports if p.port is not None]
+        # done
+        return
+
+    def display(self):
+        print(f"<compiled system> {self.system.name}")
+        print(f"  devices {len(self.devices)}")
+        print(f"  ports {len(self.ports)}")
+        print(f"  levels {max(self.levels.values(), default = -1) + 1}")
+        print(f"  lines {len(self.lines)}")
+        for d in self.timed:
+            print(f"  timed {type(d).__name__} {d.name}")
+        for d in self.interpreted:
+            print(f"  interpreted {type(d).__name__} {d.name}")
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+    from register import register
+    from gate import gate_not
+
+    ls = logic_system()
+    clk  = ls.add(clock(name = 'clock'))
+    rst  = ls.add(clock(40, 35, 5, 1, name = 'reset'))
+    cnt = ls.add(counter(4, name = 'counter'))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    ntclk = ls.add(gate_not(name = "not_clock"))
+    ntclk.add_input(clk.Q)
+    reg = ls.add(register(4, name = "register"))
+    reg.add_input(cnt.Q)
+    reg.add_clk(ntclk.Q)
+    reg.add_clr(rst.Q)
+    cs = compiled_system(ls)
+    cs.display()
+    ls.open("./export.vcd")
+    cs.run_until(500)
+    ls.close()
@@ -4,13 +4,37 @@
 # author: Roch Schanen
 
 from toolbox import *
+from heapq import heappush, heappop, heapify
+from pickle import dumps, loads
+from zlib import compress, decompress
+from os import truncate
+from fnmatch import fnmatch
+from vcd import vcd_writer, thread_writer, copy_prefix
+from waveform import wave_writer
+from profiler import profiler
+
+# checkpoint file signature
+_CHECKPOINT = b"SimSys checkpoint 4\n"
 
 ######################################################################
 ###                                                               PORT
 ######################################################################
 
+# shared contiguous subsets
+_RANGES = {}
+
+def _range(start, length):
+    key = start, length
+    if key not in _RANGES: _RANGES[key] = range(start, start + length)
+    return _RANGES[key]
+
 class logic_port():
 
+    # compact instances (no __dict__)
+    __slots__ = ('parent', 'top', 'number', 'name', 'fanout', 'events',
+        '_state', '_bits', 'width', 'subset', 'shift', 'port',
+        'up_to_date', 'rising', 'falling', 'delay')
+
     # signal counter for making signal names
     signal_counter = 0
 
@@ -25,53 +49,160 @@ class logic_port():
             ):
         # record parent
         self.parent = parent
-        # make signal name
-        self.signal = f"W{self.signal_counter}"
+        # top level device triggered by the changes (set by the system)
+        self.top = None
+        # make signal number
+        self.number = self.signal_counter
         # increment signal counter
         logic_port.signal_counter += 1
         # record port name
         self.name = name
-        # declare port state
-        self.state = None
+        # declare the ports linked to this port (list on first link)
+        self.fanout = ()
+        # changes list of the scheduler (None when not linked)
+        self.events = None
+        # wire delay (None is no delay)
+        self.delay = None
+        # declare port state (string and integer forms)
+        self._state, self._bits, self.width = None, None, 0
         # set port state
         if bits: self.set(startup_bits(bits, behav))
         # get target port size
         n = port.size() if port else None
-        # make port subset
+        # make port subset (a shared range when contiguous)
+        self.subset, self.shift = None, None
+        if port:
+            self.subset = range(n) if subset is None else tuple(subset)
+            self.width = len(self.subset)
+        # contiguous subset: extract bits by shift and mask
         if port:
-            self.subset = subset
-            if self.subset is None:
-                self.subset = list(range(n))
+            k = self.subset[0]
+            if list(self.subset) == list(range(k, k + self.width)):
+                self.subset = _range(k, self.width)
+                self.shift = k
         # record target
         self.port = port
-        # initialise state
+        # register to the target fanout
+        if port:
+            if not port.fanout: port.fanout = []
+            port.fanout.append(self)
+        # initialise state (exported on the first step)
         if port: self.update()
+        self.up_to_date = False
         # done
         return
 
+    # the signal name is built on demand
+    @property
+    def signal(self):
+        return f"W{self.number}"
+
+    # the string form is built on demand
+    @property
+    def state(self):
+        if self._state is None and self._bits is not None:
+            self._state = bits_to_state(*self._bits, self.width)
+        return self._state
+
     def size(self):
-        return len(self.state)
+        return self.width
 
     def set(self, new_state):
         self.up_to_date = (self.state == new_state)
-        self.state = new_state
+        self._state, self._bits = new_state, None
+        self.width = len(new_state)
+        # report changes to the scheduler
+        if self.up_to_date: return
+        if self.events is None: return
+        self.events.append(self)
+        # done
+        return
+
+    def set_bits(self, value, mask = 0):
+        self.up_to_date = (self.get_bits() == (value, mask))
+        # the multi-valued states always change
+        if self._bits is None: self.up_to_date = False
+        self._state, self._bits = None, (value, mask)
+        # report changes to the scheduler
+        if self.up_to_date: return
+        if self.events is None: return
+        self.events.append(self)
+        # done
         return
 
     def get(self, subset = None):
         if subset is None: return self.state
         return NUL.join([self.state[index] for index in subset])
 
+    # state of a delayed transition: the integer form, or the string
+    # form (and a None mask) for the multi-valued states
+    def get_delayed(self, subset = None):
+        bits = self.get_bits(subset)
+        if self._bits is None: return self.get(subset), None
+        # done
+        return bits
+
+    # the integer form is built on demand (the multi-valued states
+    # are only held by the string form)
+    def get_bits(self, subset = None):
+        bits = self._bits
+        if bits is None and self._state is not None:
+            bits = state_to_bits(self._state)
+            if not bits[1] or not is_multi_valued(self._state):
+                self._bits = bits
+        if subset is None: return bits
+        # collect subset bits
+        value, mask = bits
+        v = sum([((value >> k) & 1) << n for n, k in enumerate(subset)])
+        m = sum([((mask >> k) & 1) << n for n, k in enumerate(subset)])
+        # done
+        return v, m
+
     def update(self):
+        # source port state is in string form
+        if self.port._bits is None: return self.update_state()
+        # get source port state
+        if self.shift is None:
+            value, mask = self.port.get_bits(self.subset)
+        else:
+            value, mask = self.port._bits
+            ones = (1 << self.width) - 1
+            value = (value >> self.shift) & ones
+            mask = (mask >> self.shift) & ones
+        # update input port state
+        return self.apply(value, mask)
+
+    def apply(self, value, mask):
+        # single bit case
+        if self.width == 1:
+            state = self.get_bits()
+            self.rising  = (state, (value, mask)) == ((0, 0), (1, 0))
+            self.falling = (state, (value, mask)) == ((1, 0), (0, 0))
+        # update input port state
+        self.set_bits(value, mask)
+        # done (flag the changes)
+        return not self.up_to_date
+
+    def update_state(self):
         # get output port state
-        new_state = self.port.get(self.subset)
-        # code for wire delay here
-        # ...
+        return self.apply_state(self.port.get(self.subset))
+
+    def apply_state(self, new_state):
         # single bit case
         if len(new_state) == 1:
             self.rising  = (self.state, new_state) == (LOW, HGH)
             self.falling = (self.state, new_state) == (HGH, LOW)
         # update input port state
         self.set(new_state)
+        # done (flag the changes)
+        return not self.up_to_date
+
+    # the wire delay of a linked port: the port state follows the
+    # source port 'delay' ns later. an inertial delay filters out
+    # the pulses shorter than the delay, a transport delay keeps
+    # them. a zero delay removes the wire delay.
+    def set_delay(self, delay, inertial = True):
+        self.delay = (delay, inertial) if delay else None
         # done
         return
 
@@ -94,14 +225,19 @@ class logic_port():
 
 class logic_device():
 
+    # compact instances (no __dict__)
+    __slots__ = ('inputs', 'outputs', 'devices', 'name', 'delay')
+
     # constructor
     def __init__(self, name = None):
         # declare device contents
         self.inputs  = [] # input ports
         self.outputs = [] # output ports
-        self.devices = [] # devices
+        self.devices = () # devices (list on first add)
         # record name
         self.name = name
+        # device delay (None is no delay)
+        self.delay = None
         # call user start
         self.start()
         # done
@@ -135,13 +271,14 @@ class logic_device():
 
     def add(self, device):
         device.name = name_duplicate(self.devices, device.name)
+        if not self.devices: self.devices = []
         self.devices.append(device)
         return device
 
     def update_output_ports(self, timeStamp):
         # update sub-devices first
         for d in self.devices:
-            self.devices.update_outputs(timeStamp)
+            d.update_output_ports(timeStamp)
         # update 'linked' output ports
         for o in self.outputs:
             if o.port is None: continue
@@ -155,6 +292,61 @@ class logic_device():
     def update(self, timeStamp):
         pass
 
+    # device specific: emit the compiled code of update() using
+    # the compiler 'c' (see compiler.py). returns False when the
+    # device is not compiled.
+    def compile(self, c):
+        return False
+
+    # device specific: vectorised update() on all the lanes of the
+    # batch system 'b' (see batch.py). returns False when the device
+    # is not batched.
+    def batch(self, b, timeStamp):
+        return False
+
+    # the device delay: the output ports states follow the device
+    # update 'delay' ns later (see logic_port.set_delay()).
+    def set_delay(self, delay, inertial = True):
+        self.delay = (delay, inertial) if delay else None
+        # done
+        return
+
+    # device specific: the time of the next update that is not
+    # triggered by a change of the inputs (None if there is none).
+    # devices which outputs depend on time must define it.
+    def next_update(self, timeStamp):
+        # collect the sub-devices requests
+        T = [d.next_update(timeStamp) for d in self.devices]
+        T = [t for t in T if t is not None]
+        # done
+        return min(T) if T else None
+
+    # device specific: True when the device can set multi-valued
+    # states. these states are only held by the string form of the
+    # ports: the compiled, batched and partitioned engines refuse them.
+    def multi_valued(self):
+        return False
+
+    # device specific: state that is not held by the ports (any
+    # picklable value), saved and restored by the checkpoints
+    def save_state(self):
+        return None
+
+    def load_state(self, state):
+        pass
+
+    # list of this device and all sub-devices in tree order
+    def get_devices(self):
+        D = [self]
+        for d in self.devices: D += d.get_devices()
+        return D
+
+    # list of all ports in tree order
+    def get_ports(self):
+        P = self.inputs + self.outputs
+        for d in self.devices: P += d.get_ports()
+        return P
+
     def update_input_ports(self):
         # update inputs ports first
         for i in self.inputs: i.update()
@@ -163,6 +355,17 @@ class logic_device():
         # done
         return
 
+    # list of the exported ports in export order
+    def get_exported(self):
+        # unnamed
+        if self.name is None: return []
+        # go through all device contents
+        P = [i for i in self.inputs if i.name is not None]
+        for d in self.devices: P += d.get_exported()
+        P += [o for o in self.outputs if o.name is not None]
+        # done
+        return P
+
     def export(self):
         # unnamed
         if self.name is None: return NUL
@@ -179,6 +382,78 @@ class logic_device():
     def display(self, tab = None):
         pass
 
+######################################################################
+###                                                              WHEEL
+######################################################################
+
+# the timing wheel holds the delayed transitions. each transition is
+# a list [port, value, mask, wire, time] appended to the slot of its
+# time (a multi-valued state is held by 'value' with a None 'mask',
+# see logic_port.get_delayed()): adding a transition is O(1) and a
+# transition is cancelled in O(1) by clearing its port. the
+# transitions beyond the horizon of the wheel wait in a time ordered
+# queue.
+
+class timing_wheel():
+
+    def __init__(self, size = 256):
+        # slots of the next 'size' ns
+        self.size = size
+        self.slots = [[] for k in range(size)]
+        # transitions beyond the horizon
+        self.far = []
+        # time of the current slot
+        self.time = 0
+        # number of transitions held (including the cancelled ones)
+        self.count = 0
+        # done
+        return
+
+    def add(self, entry, time):
+        # empty wheel: move to the current time
+        if not self.count: self.time = time
+        # within the horizon
+        t = entry[4]
+        if t - self.time < self.size:
+            self.slots[t % self.size].append(entry)
+        # beyond the horizon
+        else:
+            heappush(self.far, (t, id(entry), entry))
+        self.count += 1
+        # done
+        return
+
+    def pop(self, time):
+        # move the wheel forward
+        self.time = time
+        # bring the transitions within the horizon
+        while self.far and self.far[0][0] - time < self.size:
+            t, n, entry = heappop(self.far)
+            self.slots[t % self.size].append(entry)
+        # collect the transitions due now
+        k = time % self.size
+        entries, self.slots[k] = self.slots[k], []
+        self.count -= len(entries)
+        # done
+        return entries
+
+    def next(self):
+        # empty wheel
+        if not self.count: return None
+        # first slot in use
+        for k in range(self.size):
+            if self.slots[(self.time + k) % self.size]:
+                return self.time + k
+        # first transition beyond the horizon
+        return self.far[0][0]
+
+    def entries(self):
+        # list all the transitions held
+        E = [e for s in self.slots for e in s]
+        E += [e for t, n, e in self.far]
+        # done
+        return E
+
 ######################################################################
 ###                                                             SYSTEM
 ######################################################################
@@ -190,11 +465,143 @@ class logic_system(logic_device):
         from time import strftime
         self.date = strftime("%A, %d %b %Y at %H:%M:%S")
         self.time = 0 # [ns]
+        # time ordered queue of the pending updates
+        self.queue = []
+        # delayed transitions and last transition of each port
+        self.wheel, self.pending = timing_wheel(), {}
+        # delayed wire transitions of the current step
+        self.wires = []
+        # devices to update on the next step (None before linking)
+        self.triggered = None
+        # dumped ports (None is all) and time windows (None is always)
+        self.dumped, self.windows, self.dumping = None, None, True
+        # device profiler (None when disabled)
+        self.profiler = None
+        # lut cache shared by the devices (None when disabled)
+        self.cache = None
+        # done
+        return
+
+    # share a lut cache of 'size' results between the devices that
+    # use one (see toolbox.lut_cache): only the rom address decoding.
+    # the gates bypass the cache. a zero size disables the cache.
+    # this is called once all the devices are added.
+    def set_cache(self, size = 4096):
+        self.cache = lut_cache(size) if size else None
+        for d in self.get_devices()[1:]:
+            if hasattr(d, 'cache'): d.cache = self.cache
         # done
         return
 
-    def open(self, fp):
-        fh = open(fp, 'w')       
+    # enable or disable the device profiler (see profiler.py)
+    def profile(self, enable = True):
+        self.profiler = profiler() if enable else None
+        # done
+        return
+
+    def link(self):
+        # list of the ports changed during the current step
+        self.events = []
+        # list of the ports with rising or falling flags set
+        self.settle = []
+        # export order of the exported ports
+        P = self.get_exported()
+        self.order = {p: k for k, p in enumerate(P)}
+        # list of the ports changed since the last export
+        self.dirty = P
+        # bind all the ports with a non empty fanout or exported
+        for d in self.devices: self.link_device(d, d)
+        # the first step updates all devices
+        self.triggered = dict.fromkeys(self.devices)
+        # done
+        return
+
+    def link_device(self, device, top):
+        # the input ports trigger the top level device (the linked
+        # output ports are updated by their device)
+        for i in device.inputs: i.top = top
+        # bind ports to the events list
+        for p in device.outputs + device.inputs:
+            if not (p.fanout or p in self.order): continue
+            p.events = self.events
+        # bind sub-devices
+        for d in device.devices: self.link_device(d, top)
+        # done
+        return
+
+    # list of the dumped ports in export order
+    def get_exported(self):
+        P = []
+        for d in self.devices: P += d.get_exported()
+        # selected ports only
+        if self.dumped is None: return P
+        return [p for p in P if p in self.dumped]
+
+    # select the dumped ports: the scope of a port is the path of
+    # the device names and the port name (e.g. "cpu.alu.Q"). a
+    # pattern matches a scope and all the scopes inside it (e.g.
+    # "cpu" or "cpu.al*"). the 'windows' are the time intervals
+    # [start, stop) of the dump (stop None is unlimited).
+    def select(self, include = None, exclude = None, windows = None):
+        # single patterns
+        if isinstance(include, str): include = [include]
+        if isinstance(exclude, str): exclude = [exclude]
+        # collect the selected ports
+        self.dumped = None
+        if include or exclude:
+            self.dumped = set()
+            for d in self.devices: self.select_device(d, NUL, include, exclude)
+        # time windows
+        self.windows = sorted(windows) if windows else None
+        # update the export order
+        if self.triggered is not None:
+            self.order = {p: k for k, p in enumerate(self.get_exported())}
+            for d in self.devices: self.link_device(d, d)
+        # done
+        return
+
+    def select_device(self, device, path, include, exclude):
+        # unnamed
+        if device.name is None: return
+        path = f"{path}{device.name}"
+        # match a scope and all the scopes inside it
+        match = lambda s, P: any([fnmatch(s, p) or fnmatch(s, f"{p}.*") for p in P])
+        # select ports
+        for p in device.inputs + device.outputs:
+            if p.name is None: continue
+            scope = f"{path}.{p.name}"
+            if include and not match(scope, include): continue
+            if exclude and match(scope, exclude): continue
+            self.dumped.add(p)
+        # select sub-devices
+        for d in device.devices: self.select_device(d, f"{path}.", include, exclude)
+        # done
+        return
+
+    # time window edges
+    def in_window(self, time):
+        if self.windows is None: return True
+        for start, stop in self.windows:
+            if start <= time and (stop is None or time < stop): return True
+        # done
+        return False
+
+    def next_edge(self, time):
+        E = [e for w in self.windows for e in w if e is not None and e > time]
+        return min(E) if E else None
+
+    def open(self, fp, size = None, include = None, exclude = None, windows = None,
+        depth = None):
+        # select the dumped ports and the time windows (or keep the
+        # current selection)
+        if include or exclude or windows: self.select(include, exclude, windows)
+        # binary waveform writer
+        if fp.endswith('.wave'): fh = wave_writer(fp)
+        # buffered writer (compressed when 'fp' ends with '.gz')
+        elif size is None: fh = vcd_writer(fp)
+        else: fh = vcd_writer(fp, size)
+        # background writer thread with a queue of 'depth' chunks
+        if depth is not None: fh = thread_writer(fh, depth)
         # register file handle
         self.fh = fh
         # write header
@@ -213,6 +620,9 @@ class logic_system(logic_device):
         align = TAB*t
         # skip unnamed port
         if device.name is None: return NUL
+        # skip the scopes without dumped ports
+        if self.dumped is not None:
+            if not self.dumped.intersection(device.get_exported()): return NUL
         # open scope
         self.fh.write(f"{align}$scope module {device.name} $end{EOL}")
         # make signals
@@ -230,6 +640,8 @@ class logic_system(logic_device):
         align = TAB*t
         # skip unnamed port
         if port.name is None: return NUL
+        # skip the ports not dumped
+        if self.dumped is not None and port not in self.dumped: return NUL
         # make label
         label = f"{device.name}_{port.name}"
         # get signal identifier and size
@@ -242,29 +654,215 @@ class logic_system(logic_device):
         return
 
     def run_until(self, time):
-        while self.time < time: self.run_step()
+        while self.time < time:
+            # get the time of the next event
+            t = self.next_event()
+            # nothing can change before 'time'
+            if t is None or t > time:
+                self.export()
+                self.time = time
+                # done
+                return
+            # skip idle time up to the next event
+            self.run_step(t)
         # done
         return
 
-    def run_step(self):
+    def run_step(self, time = None):
+        # build the fanout index on the first step
+        if self.triggered is None: self.link()
         self.export()
-        self.time += 1
-        for d in self.devices: d.update_output_ports(self.time)
-        for d in self.devices: d.update_input_ports()        
+        # default step is 1 ns
+        self.time = self.time + 1 if time is None else time
+        # output ports first
+        self.update_devices()
+        # then input ports
+        self.clear_flags()
+        self.update_links()
         # done
         return
 
+    def update_devices(self):
+        # collect devices triggered by inputs changes
+        active, self.triggered = self.triggered, {}
+        # collect time dependent updates
+        while self.queue and self.queue[0][0] <= self.time:
+            t, n, d = heappop(self.queue)
+            active[d] = None
+        # apply the delayed transitions
+        if self.wheel.count: self.apply_delayed()
+        # update the active devices only
+        if self.profiler is not None: self.profiler.update(self, active)
+        else:
+            for d in active:
+                if d.delay is None: d.update_output_ports(self.time)
+                else: self.update_delayed(d)
+        # register the time dependent updates
+        for d in active:
+            t = d.next_update(self.time)
+            if t is None: continue
+            heappush(self.queue, (t, id(d), d))
+        # done
+        return
+
+    def update_delayed(self, device):
+        # record the output ports states
+        O = [(o, o._state, o._bits, o.up_to_date, o.events)
+            for o in device.outputs]
+        # update the device without reporting the changes
+        for o in device.outputs: o.events = None
+        device.update_output_ports(self.time)
+        # restore the states and delay the changes
+        for o, state, bits, up_to_date, events in O:
+            value, mask = o.get_delayed()
+            o._state, o._bits, o.up_to_date = state, bits, up_to_date
+            o.events = events
+            self.schedule(o, value, mask, device.delay, False)
+        # done
+        return
+
+    def schedule(self, port, value, mask, delay, wire):
+        delay, inertial = delay
+        entry = self.pending.get(port)
+        # inertial delay: cancel the pending transition (unless the
+        # same transition is scheduled again)
+        if inertial and entry is not None:
+            if (value, mask) == (entry[1], entry[2]): return
+            entry[0] = None
+            del self.pending[port]
+            entry = None
+        # skip the transitions that change nothing
+        last = port.get_delayed() if entry is None else (entry[1], entry[2])
+        if (value, mask) == last: return
+        # add transition
+        entry = [port, value, mask, wire, self.time + delay]
+        self.wheel.add(entry, self.time)
+        self.pending[port] = entry
+        # done
+        return
+
+    def apply_delayed(self):
+        for entry in self.wheel.pop(self.time):
+            port, value, mask, wire, t = entry
+            # cancelled
+            if port is None: continue
+            # last transition
+            if self.pending.get(port) is entry: del self.pending[port]
+            # wire delay: applied with the input ports
+            if wire:
+                self.wires.append(entry)
+                continue
+            # device delay: applied with the output ports
+            if mask is None: port.set(value)
+            else: port.set_bits(value, mask)
+        # done
+        return
+
+    def clear_flags(self):
+        # clear rising and falling flags of the previous step
+        for i in self.settle: i.rising = i.falling = False
+        self.settle.clear()
+        # done
+        return
+
+    def update_links(self):
+        # apply the delayed wire transitions
+        for i, value, mask, wire, t in self.wires:
+            if mask is None: changed = i.apply_state(value)
+            else: changed = i.apply(value, mask)
+            if not changed: continue
+            self.triggered[i.top] = None
+            self.settle.append(i)
+        self.wires.clear()
+        # propagate changes to the linked ports
+        n = 0
+        while n < len(self.events):
+            for i in self.events[n].fanout:
+                # the linked output ports follow their device update
+                d = i.top
+                if d is None: continue
+                # delayed wire
+                if i.delay is not None:
+                    value, mask = i.port.get_delayed(i.subset)
+                    self.schedule(i, value, mask, i.delay, True)
+                    continue
+                # skip unchanged ports
+                if not i.update(): continue
+                # trigger the top level device on the next step
+                self.triggered[d] = None
+                self.settle.append(i)
+            n += 1
+        # record the changes for the export
+        self.dirty += self.events
+        self.events.clear()
+        # done
+        return
+
+    def next_event(self):
+        # inputs have changed: compute the next step
+        if self.triggered is None: return self.time + 1
+        if self.triggered: return self.time + 1
+        # get the next pending update or delayed transition
+        T = [self.wheel.next()]
+        if self.queue: T.append(self.queue[0][0])
+        # get the next time window edge
+        if self.windows: T.append(self.next_edge(self.time))
+        T = [t for t in T if t is not None]
+        # nothing else will ever change
+        return min(T) if T else None
+
     def export(self):
-        # recursively build the export string
-        export_string = NUL
-        # make export string from all device
-        for d in self.devices:
-            export_string += d.export()
+        # build the fanout index first
+        if self.triggered is None: self.link()
+        # collect the exported ports changed since the last export
+        # (including the changes made between the steps)
+        P = {p: None for p in self.dirty + self.events if p in self.order}
+        self.dirty.clear()
+        # time windows
+        if self.windows is not None:
+            if not self.export_window(): return
+        # make export string in export order
+        P = sorted(P, key = self.order.get)
+        # or hand the changed ports states to the writer thread
+        if isinstance(self.fh, thread_writer):
+            R = [(p, p._state or p._bits) for p in P if not p.up_to_date]
+            for p, s in R: p.up_to_date = True
+            if R: self.fh.write_changes(self.time, R)
+            return
+        export_string = NUL.join([p.export() for p in P])
         # skip if empty string
-        if export_string is NUL: return
+        if not export_string: return
         # export string to file
-        self.fh.write(f"#{self.time:04}")
-        self.fh.write(f"{SPC}{export_string}{EOL}")
+        self.fh.write(f"#{self.time:04}{SPC}{export_string}{EOL}")
+        # done
+        return
+
+    def export_window(self):
+        dumping = self.in_window(self.time)
+        # outside the windows
+        if not dumping:
+            if self.dumping: self.export_dumpoff()
+            self.dumping = False
+            return False
+        # inside the windows
+        if not self.dumping: self.export_dumpon()
+        self.dumping = True
+        # done
+        return True
+
+    def export_dumpoff(self):
+        # all the dumped ports are unknown
+        X = [f"bx {p.signal}" if p.size() > 1 else f"x{p.signal}"
+            for p in self.order]
+        self.fh.write(f"#{self.time:04}{SPC}$dumpoff {SPC.join(X)} $end{EOL}")
+        # done
+        return
+
+    def export_dumpon(self):
+        # all the dumped ports values
+        for p in self.order: p.up_to_date = False
+        export_string = NUL.join([p.export() for p in self.order])
+        self.fh.write(f"#{self.time:04}{SPC}$dumpon {export_string}$end{EOL}")
         # done
         return
 
@@ -274,6 +872,109 @@ class logic_system(logic_device):
         # done
         return
 
+    def checkpoint(self, fp):
+        # the waveform files are only complete once closed
+        fh = getattr(self, 'fh', None)
+        if fh and not fh.closed and fh.name.endswith('.wave'):
+            raise ValueError(f"{fh.name}: waveform files can not be checkpointed")
+        # build the fanout index first
+        if self.triggered is None: self.link()
+        # index devices and ports
+        D, P = self.get_devices()[1:], self.get_ports()
+        index = {d: k for k, d in enumerate(D)}
+        # collect port states (multi-valued states in string form)
+        # and signal numbers (the identifiers of the export file)
+        S = [p.get_bits() for p in P]
+        S = [p.state if p._bits is None else s for p, s in zip(P, S)]
+        ports = [(s, p.up_to_date,
+            getattr(p, 'rising', None),
+            getattr(p, 'falling', None), p.number) for p, s in zip(P, S)]
+        # collect device specific states
+        devices = [d.save_state() for d in D]
+        # collect scheduler state
+        triggered = [index[d] for d in self.triggered]
+        queue = [(t, index[d]) for t, n, d in self.queue]
+        settle = {p: k for k, p in enumerate(P)}
+        wheel = [(settle[e[0]], *e[1:], self.pending.get(e[0]) is e)
+            for e in self.wheel.entries() if e[0] is not None]
+        settle = [settle[i] for i in self.settle]
+        # get export file position
+        vcd = None
+        fh = getattr(self, 'fh', None)
+        if fh and not fh.closed:
+            fh.flush()
+            vcd = fh.name, fh.tell()
+        # write file
+        state = (len(D), len(P), self.time, ports, devices,
+            triggered, queue, settle, wheel, vcd, self.dumping)
+        fh = open(fp, 'wb')
+        fh.write(_CHECKPOINT)
+        fh.write(compress(dumps(state)))
+        fh.close()
+        # done
+        return
+
+    def restore(self, fp, vcd = None):
+        # the export is continued in text form
+        if vcd and vcd.endswith('.wave'):
+            raise ValueError(f"{vcd}: waveform files can not be restored")
+        # read file
+        fh = open(fp, 'rb')
+        data = fh.read()
+        fh.close()
+        if not data.startswith(_CHECKPOINT):
+            raise ValueError(f"{fp} is not a checkpoint file")
+        state = loads(decompress(data[len(_CHECKPOINT):]))
+        nd, n, time, ports, devices, triggered, queue, settle, wheel, export, dumping = state
+        # build the fanout index first
+        if self.triggered is None: self.link()
+        # check the system matches the checkpoint
+        D, P = self.get_devices()[1:], self.get_ports()
+        if not (nd, n) == (len(D), len(P)):
+            raise ValueError(f"{fp} does not match the system")
+        # restore port states, flags and signal numbers (a system
+        # built again in the same process has other numbers)
+        for p, (bits, up_to_date, rising, falling, number) in zip(P, ports):
+            p._state, p._bits, p.up_to_date = None, bits, up_to_date
+            p.number = number
+            if isinstance(bits, str): p._state, p._bits = bits, None
+            if rising is not None: p.rising = rising
+            if falling is not None: p.falling = falling
+        # restore device specific states
+        for d, s in zip(D, devices): d.load_state(s)
+        # restore scheduler state
+        self.time = time
+        self.events.clear()
+        self.triggered = dict.fromkeys([D[k] for k in triggered])
+        self.queue = [(t, id(D[k]), D[k]) for t, k in queue]
+        heapify(self.queue)
+        self.settle[:] = [P[k] for k in settle]
+        self.dirty[:] = [p for p in self.order if not p.up_to_date]
+        self.dumping = dumping
+        self.wheel, self.pending = timing_wheel(), {}
+        for k, value, mask, wire, t, pending in wheel:
+            entry = [P[k], value, mask, wire, t]
+            self.wheel.add(entry, time)
+            if pending: self.pending[P[k]] = entry
+        # restore export file
+        if export is None: return
+        path, position = export
+        # close the current export file
+        fh = getattr(self, 'fh', None)
+        if fh: fh.close()
+        threaded = isinstance(fh, thread_writer)
+        # continue the export file
+        if vcd is None: vcd = path
+        if vcd == path and not path.endswith('.gz'):
+            truncate(path, position)
+        # or copy the export file up to the checkpoint
+        else:
+            copy_prefix(path, vcd, position)
+        self.fh = vcd_writer(vcd, position = position)
+        if threaded: self.fh = thread_writer(self.fh, fh.depth)
+        # done
+        return
+
     def display(self):
         print(f"<logic system>:")
         for d in self.devices: d.display(1)
@@ -19,6 +19,7 @@
 
 from toolbox import *
 from core import logic_device
+from numpy import where
 
 ######################################################################
 #                                                                CLOCK
@@ -77,6 +78,52 @@ class counter(logic_device):
         # done
         return
 
+    def compile(self, c):
+        # get configuration
+        bits = self.configuration
+        # get output names
+        v, m = c.v(self.Q), c.m(self.Q)
+        # only single bit clock and clear are compiled
+        for p in [self.clr, self.clk]:
+            if p and p.size() > 1: return False
+        # asynchronous clear on active low
+        k = f"if"
+        if self.clr:
+            c.emit(f"if not ({c.v(self.clr)} | {c.m(self.clr)}):")
+            c.emit(f"    {v}, {m} = 0, 0")
+            k = f"elif"
+        # update on rising edge of trigger
+        if self.clk:
+            c.emit(f"{k} {c.r(self.clk)}:")
+            c.emit(f"    if {m}: raise ValueError('unknown counter value')")
+            c.emit(f"    {v} = ({v} + 1) & {(1 << bits) - 1}")
+        # done
+        return True
+
+    def batch(self, b, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # only single bit clock and clear are batched
+        for p in [self.clr, self.clk]:
+            if p and p.size() > 1: return False
+        # get output state
+        v, m = b.get(self.Q)
+        # asynchronous clear on active low
+        clear = False
+        if self.clr:
+            cv, cm = b.get(self.clr)
+            clear = (cv | cm) == 0
+        # update on rising edge of trigger
+        if self.clk:
+            rising = b.rising(self.clk) & ~clear
+            if (m[rising] != 0).any():
+                raise ValueError('unknown counter value')
+            v = where(rising, (v + 1) & ((1 << bits) - 1), v)
+        # update output value
+        b.set(self.Q, where(clear, 0, v), where(clear, 0, m))
+        # done
+        return True
+
     def display(self, tab):
         # get name
         name = self.name
@@ -5,6 +5,7 @@
 
 from toolbox import *
 from core import logic_device
+from sys import intern
 
 # to do: add table to configuration?
 
@@ -14,9 +15,18 @@ from core import logic_device
 # all gates require at least one input port. inputs with multiple bits
 # are allowed and behave like bus operations. this is equivalent to the
 # action of a set of parallel gates on each bits of the inputs.
+#
+# the inputs without unknown bits are evaluated on whole words by the
+# gate specific evaluate() (integer bitwise operations). the unknown
+# bits are propagated by the operator table of the gate. the gates do
+# not use the lut cache of the system: the bitwise evaluation is
+# faster than a cache lookup.
 
 class _gate(logic_device):
 
+    # compact instances (no __dict__)
+    __slots__ = ('Q', 'configuration', 'table', 'width')
+
     gn = "generic_name"
 
     def __init__(self, bits = 1, name = None):
@@ -26,6 +36,8 @@ class _gate(logic_device):
         self.Q = self.add_output_port(bits, "Q")
         # save configuration
         self.configuration = bits
+        # evaluated width (the narrowest input, like lut())
+        self.width = bits
         # done
         return
 
@@ -37,8 +49,11 @@ class _gate(logic_device):
             print(f"  width mismatch warning:")
             print(f"    {no} bit(s) expected from output width,")
             print(f"    {ni} bit(s) found for input {i.name}.")
-        # immediately update table
+        # the output width follows the narrowest input
+        self.width = min([i.size() for i in self.inputs])
+        # immediately update table (tables are shared)
         self.make_table(1 << len(self.inputs))
+        self.table = intern(self.table)
         # done
         return
 
@@ -46,14 +61,63 @@ class _gate(logic_device):
     def make_table(self, n):
         pass
 
+    # gate specific: output value of the input values 'V' (without
+    # unknown bits). the default reads the table of the gate.
+    def evaluate(self, V, ones):
+        return lut_bits(self.table, ones.bit_length(), *[(v, 0) for v in V])[0]
+
     def update(self, timeStamp):
-        # collect input states
-        S = [i.get() for i in self.inputs]
+        # get configuration
+        bits = self.configuration
+        # collect input states in integer form
+        V, mask = [], 0
+        for i in self.inputs:
+            v, m = i.get_bits()
+            V.append(v)
+            mask |= m
+        # states other than 0 and 1: use the operator table
+        if mask:
+            S = [i.get() for i in self.inputs]
+            self.Q.set(lut_states(self.table, *S))
+            return
         # update output
-        self.Q.set(lut(self.table, *S))
+        w = self.width
+        if w == bits: self.Q.set_bits(self.evaluate(V, (1 << bits) - 1))
+        # width mismatch: the output width follows the inputs
+        else: self.Q.set(bits_to_state(self.evaluate(V, (1 << w) - 1), 0, w))
         # done
         return
 
+    def batch(self, b, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # the inputs must match the output width
+        if not self.width == bits: return False
+        # collect input states of all lanes
+        S = [b.get(i) for i in self.inputs]
+        # update output
+        b.set(self.Q, *lut_bits(self.table, bits, *S))
+        # done
+        return True
+
+    def compile(self, c):
+        # get configuration
+        bits = self.configuration
+        # the inputs must match the output width
+        if not self.inputs: return False
+        for i in self.inputs:
+            if not i.size() == bits: return False
+        # build the table expression
+        V = [c.v(i) for i in self.inputs]
+        value = c.minterms(self.table, V, bits)
+        if value is None: return False
+        # update output
+        v, m = c.v(self.Q), c.m(self.Q)
+        c.emit(f"{m} = {' | '.join([c.m(i) for i in self.inputs])}")
+        c.emit(f"{v} = {value} & ~{m}")
+        # done
+        return True
+
     def display(self, tab):
         # get name
         name = self.name
@@ -75,48 +139,75 @@ class _gate(logic_device):
 
 class gate_and(_gate):
 
+    __slots__ = ()
+
     gn = "gate_AND"
 
     def make_table(self, n):
         self.table = LOW*(n-1) + HGH*1
         return
 
+    def evaluate(self, V, ones):
+        for v in V: ones &= v
+        return ones
+
 ######################################### NAND (not AND)
 # for only one input, this is equivalent to an 'INVERSE' bits
 # (this is not recommanded since it is not standard)
 
 class gate_nand(_gate):
 
+    __slots__ = ()
+
     gn = "gate_NAND"
 
     def make_table(self, n):
         self.table = HGH*(n-1) + LOW*1
         return
 
+    def evaluate(self, V, ones):
+        value = ones
+        for v in V: value &= v
+        return ~value & ones
+
 ######################################### OR
 # for only one input, this is equivalent to a 'COPY' bits
 # (this is not recommanded since it is not standard)
 
 class gate_or(_gate):
 
+    __slots__ = ()
+
     gn = "gate_OR"
 
     def make_table(self, n):
         self.table = LOW*1 + HGH*(n-1)
         return
 
+    def evaluate(self, V, ones):
+        value = 0
+        for v in V: value |= v
+        return value & ones
+
 ######################################### NOR (not OR)
 # for only one input, this is equivalent to an 'INVERSE' bits
 # (this is not recommanded since it is not standard)
 
 class gate_nor(_gate):
 
+    __slots__ = ()
+
     gn = "gate_NOR"
 
     def make_table(self, n):
         self.table = HGH*1 + LOW*(n-1)
         return
 
+    def evaluate(self, V, ones):
+        value = 0
+        for v in V: value |= v
+        return ~value & ones
+
 ######################################### EQU (equal)
 # for only one input, this is equivalent to a set of constant 'HIGH' bits.
 # for more than two inputs, this is equivalent to a 'ALL BITS EQUAL'.
@@ -124,12 +215,20 @@ class gate_nor(_gate):
 
 class gate_equ(_gate):
 
+    __slots__ = ()
+
     gn = "gate_EQU"
 
     def make_table(self, n):
         self.table = HGH*1 + LOW*(n-2) + HGH*1
         return
 
+    # all bits equal: all ones or all zeros
+    def evaluate(self, V, ones):
+        a, o = ones, 0
+        for v in V: a, o = a & v, o | v
+        return (a | ~o) & ones
+
 ######################################### EOR (exclusive OR)
 # for only one input, this is equivalent to a set of constant 'LOW' bits.
 # for more than two inputs, this is equivalent to a 'NOT ALL BITS EQUAL'.
@@ -137,12 +236,20 @@ class gate_equ(_gate):
 
 class gate_eor(_gate):
 
+    __slots__ = ()
+
     gn = "gate_EOR"
 
     def make_table(self, n):
         self.table = LOW*1 + HGH*(n-2) + LOW*1
         return
 
+    # not all bits equal: some ones and some zeros
+    def evaluate(self, V, ones):
+        a, o = ones, 0
+        for v in V: a, o = a & v, o | v
+        return o & ~a & ones
+
 ######################################################################
 ###                                                           GATE_NOT
 ######################################################################
@@ -152,6 +259,8 @@ class gate_eor(_gate):
 
 class gate_not(_gate):
 
+    __slots__ = ()
+
     def __init__(self, bits = 1, name = None):
         # call parent class constructor
         logic_device.__init__(self, name)
@@ -173,13 +282,51 @@ class gate_not(_gate):
         return
 
     def update(self, timeStamp):
-        # collect input states and concatenate all
-        S = NUL.join([i.get() for i in self.inputs])
+        # get configuration
+        bits = self.configuration
+        # collect input states in integer form and concatenate all
+        value, mask, n = 0, 0, 0
+        for i in self.inputs:
+            v, m = i.get_bits()
+            value, mask = value | v << n, mask | m << n
+            n += i.size()
+        # states other than 0 and 1: use the operator table
+        if mask:
+            S = NUL.join([i.get() for i in self.inputs])
+            self.Q.set(lut_states(self.table, S))
+            return
         # update output
-        self.Q.set(lut(self.table, S))
+        if n == bits: self.Q.set_bits(~value & ((1 << bits) - 1))
+        # width mismatch: the output width follows the inputs
+        else: self.Q.set(bits_to_state(~value & ((1 << n) - 1), 0, n))
         # done
         return
 
+    def batch(self, b, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # collect input states of all lanes and concatenate all
+        value, mask, n = b.concat(self.inputs)
+        # the inputs must match the output width
+        if not n == bits: return False
+        # update output
+        b.set(self.Q, *lut_bits(self.table, bits, (value, mask)))
+        # done
+        return True
+
+    def compile(self, c):
+        # get configuration
+        bits = self.configuration
+        # concatenate all inputs
+        av, am, n = c.concat(self.inputs)
+        # the inputs must match the output width
+        if not n == bits: return False
+        # update output
+        v, m = c.v(self.Q), c.m(self.Q)
+        c.emit(f"{v}, {m} = ~({av} | {am}) & {(1 << bits) - 1}, {am}")
+        # done
+        return True
+
     def display(self, tab):
         # get name
         name = self.name
@@ -0,0 +1,227 @@
+# file: loader.py
+# content: ROM image loaders
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the image loader reads a ROM image file in chunks and writes the
+    words directly into a packed buffer (bytearray) that the rom
+    device uses as its store (see rom.py): each word is made of whole
+    bytes in little endian order.
+
+    three formats are supported:
+
+    - "table": the text format of load_table() (BASE and BITS lines,
+               words separated by spaces, '#' comment lines)
+    - "ihex" : Intel HEX records (data, end of file, extended segment
+               and linear addresses). the gaps between the records
+               are filled with zeros.
+    - "raw"  : raw binary image
+
+    the format is found from the file extension (".hex", ".ihex" for
+    Intel HEX, ".bin", ".img", ".raw" for raw binary, the text format
+    otherwise) or can be given. the words of the Intel HEX and raw
+    binary images are 'bits' wide (8 by default).
+
+    the loader records the size of the file, the number of words and
+    the loading time: display() reports the throughput.
+'''
+
+from toolbox import *
+from time import perf_counter
+from numpy import array, uint64, uint8
+from os.path import getsize
+
+# chunk size in bytes (local symbol)
+_CHUNK = 1 << 20
+
+# formats by file extension
+_FORMATS = {
+    '.hex': 'ihex', '.ihex': 'ihex',
+    '.bin': 'raw', '.img': 'raw', '.raw': 'raw',
+    }
+
+# text format bases
+_BASES = {'HEX': 16, 'DEC': 10, 'BIN': 2}
+
+######################################################################
+#                                                                 PACK
+######################################################################
+# append the words to the image ('step' bytes per word, little endian)
+
+
+def _pack(image, W, step):
+    if not W: return
+    # up to 64 bits words
+    if step <= 8:
+        B = array(W, uint64).astype('<u8').view(uint8).reshape(-1, 8)
+        image += B[:, :step].tobytes()
+        return
+    # wider words
+    for w in W: image += w.to_bytes(step, 'little')
+    # done
+    return
+
+######################################################################
+#                                                         IMAGE_LOADER
+######################################################################
+
+
+class image_loader():
+
+    def __init__(self, fp, fmt = None, bits = 8, chunk = _CHUNK):
+        # record file path and format
+        self.name = fp
+        if fmt is None:
+            fmt = _FORMATS.get(fp[fp.rfind('.'):].lower(), 'table')
+        self.fmt = fmt
+        # word width (the text format can change it)
+        self.bits, self.chunk = bits, chunk
+        # packed image
+        self.image = bytearray()
+        # statistics
+        self.size, self.words, self.seconds = 0, 0, 0.0
+        # done
+        return
+
+    def load(self):
+        start = perf_counter()
+        {'table': self.load_table,
+         'ihex': self.load_ihex,
+         'raw': self.load_raw,
+         }[self.fmt]()
+        self.seconds = perf_counter() - start
+        self.size = getsize(self.name)
+        self.words = len(self.image) // ((self.bits + 7) // 8)
+        # done
+        return self.image, self.bits
+
+    ##################################################### TABLE
+
+    def load_table(self):
+        base, bits, line_number = 16, self.bits, 0
+        fh = open(self.name, 'r')
+        while True:
+            # read a chunk of lines
+            L = fh.readlines(self.chunk)
+            if not L: break
+            W = []
+            for line in L:
+                line_number += 1
+                line = line.strip()
+                # skip empty and comment lines
+                if not line or line[0] == '#': continue
+                # parse BITS
+                if line[:4] == 'BITS':
+                    # the words of the image have one width
+                    if self.image or W:
+                        raise ValueError(f"{self.name}: line {line_number}: BITS after data")
+                    bits = int(line.split('=')[1].strip())
+                    continue
+                # parse BASE
+                if line[:4] == 'BASE':
+                    base = _BASES[line.split('=')[1].strip()]
+                    continue
+                # collect words (the bits exceeding 'bits' are ignored)
+                W += [int(word, base) for word in line.split()]
+            ones = (1 << bits) - 1
+            _pack(self.image, [w & ones for w in W], (bits + 7) // 8)
+        fh.close()
+        self.bits = bits
+        # done
+        return
+
+    ##################################################### INTEL HEX
+
+    def load_ihex(self):
+        image, base, end = self.image, 0, False
+        fh = open(self.name, 'r')
+        while not end:
+            # read a chunk of records
+            L = fh.readlines(self.chunk)
+            if not L: break
+            for line in L:
+                line = line.strip()
+                if not line: continue
+                if not line[0] == ':':
+                    raise ValueError(f"{self.name}: invalid record {line}")
+                R = bytes.fromhex(line[1:])
+                if sum(R) & 0xFF:
+                    raise ValueError(f"{self.name}: checksum error {line}")
+                n, address, kind = R[0], R[1] << 8 | R[2], R[3]
+                # data
+                if kind == 0:
+                    a = base + address
+                    if len(image) < a: image += bytes(a - len(image))
+                    image[a:a + n] = R[4:4 + n]
+                # end of file
+                elif kind == 1:
+                    end = True
+                    break
+                # extended segment address
+                elif kind == 2: base = (R[4] << 8 | R[5]) << 4
+                # extended linear address
+                elif kind == 4: base = (R[4] << 8 | R[5]) << 16
+                # start addresses are ignored
+        fh.close()
+        # done
+        return
+
+    ##################################################### RAW
+
+    def load_raw(self):
+        fh = open(self.name, 'rb')
+        while True:
+            block = fh.read(self.chunk)
+            if not block: break
+            self.image += block
+        fh.close()
+        # done
+        return
+
+    ##################################################### STATISTICS
+
+    def display(self):
+        seconds = self.seconds or 1e-9
+        print(f"<image loader> {self.name} ({self.fmt})")
+        print(f"  {self.words} words of {self.bits} bits in {len(self.image)} bytes")
+        print(f"  {self.size / seconds / 1e6:.1f} MB/s, {self.words / seconds:.0f} words/s")
+        # done
+        return
+
+######################################################################
+#                                                           LOAD_IMAGE
+######################################################################
+# load an image and return the packed image and the word width
+
+
+def load_image(fp, fmt = None, bits = 8):
+    return image_loader(fp, fmt, bits).load()
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from counter import counter
+    from clock import clock
+    from rom import rom
+
+    loader = image_loader("./and.rom")
+    image, bits = loader.load()
+    loader.display()
+
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(20, 15, 5, 1, name = "reset"))
+    cnt = ls.add(counter(2, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    mem = ls.add(rom(image, bits, name = 'and'))
+    mem.add_address(cnt.Q)
+    ls.display()
+    ls.open("./export.vcd")
+    ls.run_until(150)
+    ls.close()
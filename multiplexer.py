@@ -16,6 +16,10 @@
 
 from toolbox import *
 from core import logic_device
+from numpy import where
+
+# strength reduction of the address (local symbol)
+_X01 = str.maketrans(STATES, 'UX01XX01X')
 
 ######################################################################
 #                                                          MULTIPLEXER
@@ -56,12 +60,17 @@ class multiplexer(logic_device):
         bits = self.configuration
         # concatenate address inputs
         S = NUL.join([s.get() for s in self.S])
-        # check for uninitialized bit(s)
-        if UKN in S:
+        # states other than 0 and 1 (weak levels are read as 0 and 1)
+        if not S.isdigit():
+            S = S.translate(_X01)
             # set uninitialised output
-            self.Q.set(UKN * bits)
-            # done
-            return
+            if UKN in S:
+                self.Q.set(UKN * bits)
+                return
+            # set unknown output
+            if CNF in S:
+                self.Q.set(CNF * bits)
+                return
         # compute address pointer
         p = int(S[::-1], 2) * bits
         # buid data inputs table
@@ -71,6 +80,48 @@ class multiplexer(logic_device):
         # done
         return
 
+    def compile(self, c):
+        # get configuration
+        bits = self.configuration
+        # get output names
+        v, m = c.v(self.Q), c.m(self.Q)
+        # address and data are required
+        if not (self.S and self.A): return False
+        # concatenate address and data inputs
+        sv, sm, ns = c.concat(self.S)
+        av, am, na = c.concat(self.A)
+        # the address must remain within the data
+        if (1 << ns) * bits > na: return False
+        # uninitialized address bit(s)
+        ones, p = (1 << bits) - 1, c.tmp(self, 'p')
+        c.emit(f"if {sm}: {v}, {m} = 0, {ones}")
+        c.emit(f"else:")
+        c.emit(f"    {p} = {sv} * {bits}")
+        c.emit(f"    {v}, {m} = ({av} >> {p}) & {ones}, ({am} >> {p}) & {ones}")
+        # done
+        return True
+
+    def batch(self, b, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # address and data are required
+        if not (self.S and self.A): return False
+        # concatenate address and data inputs
+        sv, sm, ns = b.concat(self.S)
+        av, am, na = b.concat(self.A)
+        # the address must remain within the data
+        if (1 << ns) * bits > na: return False
+        # copy selected data to multiplexer output
+        ones, p = (1 << bits) - 1, sv * bits
+        v, m = (av >> p) & ones, (am >> p) & ones
+        # uninitialized address bit(s)
+        unknown = sm != 0
+        v, m = where(unknown, 0, v), where(unknown, ones, m)
+        # update output value
+        b.set(self.Q, v, m)
+        # done
+        return True
+
     def display(self, tab=None):
         # build tab
         t = f"{'':{4*tab}} "
@@ -0,0 +1,237 @@
+# file: partition.py
+# content: partitioned simulation on several processes
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the partitioned system splits the top level devices of a logic
+    system into partitions which run in separate worker processes.
+    the workers are forked: each one inherits a full copy of the
+    system and only updates the devices of its own partition.
+
+    the ports driven by one partition and linked to ports of another
+    partition are the boundary ports. their changes are exchanged
+    once per step through the parent process. since every device
+    output is computed from the inputs latched at the previous ns,
+    a step of each worker is made of: the input phase of the remote
+    changes of the previous step, the export of the previous step,
+    the output phase and the local input phase.
+
+    the parent process merges the exported strings of the workers in
+    the order of the top level devices and writes the VCD file: the
+    output is the same as the single process run. the worker
+    processes require the 'fork' start method (linux).
+'''
+
+from toolbox import *
+from multiprocessing import get_context
+
+######################################################################
+#                                                               WORKER
+######################################################################
+
+
+def _collect_ports(device, ports):
+    for p in device.inputs + device.outputs: ports.append(p)
+    for d in device.devices: _collect_ports(d, ports)
+    # done
+    return ports
+
+
+def _collect_devices(device, devices):
+    devices.add(device)
+    for d in device.devices: _collect_devices(d, devices)
+    # done
+    return devices
+
+
+def _worker(ls, own, boundary_out, boundary_in, pipe):
+    # collect ports in tree order (same order as the parent)
+    P = []
+    for d in ls.devices: _collect_ports(d, P)
+    # keep the own devices only
+    D = [ls.devices[k] for k in own]
+    local = set()
+    for d in D: _collect_devices(d, local)
+    ls.devices = D
+    # keep the local fanout only
+    for p in P: p.fanout = [i for i in p.fanout if i.parent in local]
+    ls.link()
+    # bind the remote ports that drive local ports
+    for k in boundary_in: P[k].events = ls.events
+    # last states sent to the parent
+    sent = {k: P[k].get_bits() for k in boundary_out}
+    # run steps
+    while True:
+        message, t, changes = pipe.recv()
+        # stop
+        if message == 'stop': break
+        # input phase of the remote changes of the previous step
+        for k, (v, m) in changes: P[k].set_bits(v, m)
+        ls.update_links()
+        # export the previous step
+        E = [(k, d.export()) for k, d in zip(own, D)]
+        ls.dirty.clear()
+        # flush only
+        if message == 'flush':
+            pipe.send((E, [], bool(ls.triggered), ls.next_event()))
+            continue
+        # output phase
+        ls.time = t
+        ls.update_devices()
+        # collect boundary changes
+        C = []
+        for k in boundary_out:
+            b = P[k].get_bits()
+            if b == sent[k]: continue
+            sent[k] = b
+            C.append((k, b))
+        # input phase
+        ls.clear_flags()
+        ls.update_links()
+        # report
+        pipe.send((E, C, bool(ls.triggered), ls.next_event()))
+    # done
+    pipe.close()
+    return
+
+######################################################################
+#                                                   PARTITIONED_SYSTEM
+######################################################################
+
+
+class partitioned_system():
+
+    def __init__(self, system, partitions = 2):
+        # record system
+        self.system = system
+        # split the top level devices in contiguous blocks
+        if isinstance(partitions, int):
+            n = len(system.devices)
+            partitions = [list(range(n))[k*n//partitions:(k+1)*n//partitions]
+                for k in range(partitions)]
+        # or use the given lists of devices
+        else:
+            partitions = [[system.devices.index(d) for d in p]
+                for p in partitions]
+        self.partitions = [p for p in partitions if p]
+        # find the partition of each device
+        owner = {}
+        for n, p in enumerate(self.partitions):
+            for k in p:
+                for d in _collect_devices(system.devices[k], set()):
+                    owner[d] = n
+        # find the boundary ports
+        P = []
+        for d in system.devices: _collect_ports(d, P)
+        # the delays are only supported by the logic system
+        if any([x.delay for x in list(owner) + P]):
+            raise ValueError("delays are not supported by the partitioned system")
+        # the multi-valued states are only supported by the logic system
+        M = [d for d in owner if d.multi_valued()]
+        M += [p for p in P if p.state and is_multi_valued(p.state)]
+        if M: raise ValueError("multi-valued states are not supported by the partitioned system")
+        # the selective dump is only supported by the logic system
+        if system.dumped is not None or system.windows:
+            raise ValueError("selective dumps are not supported by the partitioned system")
+        index = {p: k for k, p in enumerate(P)}
+        self.boundary_out = [[] for p in self.partitions]
+        self.boundary_in = [[] for p in self.partitions]
+        self.route = {}
+        for k, p in enumerate(P):
+            R = sorted(set([owner[i.parent] for i in p.fanout]) - {owner[p.parent]})
+            if not R: continue
+            self.boundary_out[owner[p.parent]].append(k)
+            for n in R: self.boundary_in[n].append(k)
+            self.route[k] = R
+        # start workers
+        self.pipes, self.workers = [], []
+        context = get_context('fork')
+        for n, p in enumerate(self.partitions):
+            a, b = context.Pipe()
+            w = context.Process(target = _worker, args = (system, p,
+                self.boundary_out[n], self.boundary_in[n], b), daemon = True)
+            w.start()
+            self.pipes.append(a)
+            self.workers.append(w)
+        # the first step is always computed
+        self.time, self.next = system.time, system.time + 1
+        self.changes = [[] for p in self.partitions]
+        # done
+        return
+
+    def exchange(self, message, t):
+        # send step and remote changes to all workers
+        for pipe, C in zip(self.pipes, self.changes):
+            pipe.send((message, t, C))
+        self.changes = [[] for p in self.partitions]
+        # collect replies
+        E, busy, W = [], False, []
+        for pipe in self.pipes:
+            e, C, b, w = pipe.recv()
+            E += e
+            busy |= b or bool(C)
+            if w is not None: W.append(w)
+            # route boundary changes
+            for k, bits in C:
+                for n in self.route[k]: self.changes[n].append((k, bits))
+        # next event
+        self.next = t + 1 if busy else min(W, default = None)
+        # export the previous step in tree order
+        E.sort()
+        export_string = NUL.join([e for k, e in E])
+        if export_string:
+            self.system.fh.write(f"#{self.time:04}")
+            self.system.fh.write(f"{SPC}{export_string}{EOL}")
+        # done
+        return
+
+    def run_until(self, time):
+        while self.next is not None and self.next <= time:
+            t = self.next
+            self.exchange('step', t)
+            self.time = t
+        # export the last step
+        self.exchange('flush', self.time)
+        self.time = time
+        self.system.time = time
+        # done
+        return
+
+    def close(self):
+        # stop workers
+        for pipe in self.pipes: pipe.send(('stop', None, None))
+        for w in self.workers: w.join()
+        # close file
+        self.system.fh.close()
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+    from register import register
+    from gate import gate_not
+
+    ls = logic_system()
+    clk  = ls.add(clock(name = 'clock'))
+    rst  = ls.add(clock(40, 35, 5, 1, name = 'reset'))
+    cnt = ls.add(counter(4, name = 'counter'))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    ntclk = ls.add(gate_not(name = "not_clock"))
+    ntclk.add_input(clk.Q)
+    reg = ls.add(register(4, name = "register"))
+    reg.add_input(cnt.Q)
+    reg.add_clk(ntclk.Q)
+    reg.add_clr(rst.Q)
+    ls.open("./export.vcd")
+    ps = partitioned_system(ls, 2)
+    ps.run_until(500)
+    ps.close()
@@ -0,0 +1,139 @@
+# file: profiler.py
+# content: device profiling of the logic system
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the profiler records, for each device updated by the logic system
+    (the top level devices, including their sub-devices), the number
+    of updates, the number of output ports changes and the wall time
+    spent in the updates. the statistics are also summed up by device
+    class (clock, counter, gate_and, rom, ...).
+
+    the profiler is enabled with logic_system.profile(): when it is
+    disabled the logic system only tests one attribute per step. the
+    delayed devices are timed but their output changes are delayed
+    transitions which are not counted. the compiled, batched and
+    partitioned engines are not profiled.
+
+    stats() returns the statistics as a dictionary and display()
+    prints the devices and the classes sorted by time.
+'''
+
+from toolbox import *
+from time import perf_counter
+
+######################################################################
+#                                                             PROFILER
+######################################################################
+
+
+class profiler():
+
+    def __init__(self):
+        # statistics by device: [updates, changes, time]
+        self.devices = {}
+        # number of profiled steps
+        self.steps = 0
+        # done
+        return
+
+    def update(self, system, active):
+        S = self.devices
+        for d in active:
+            # record the output ports states
+            O = [(o, o._state, o._bits) for o in d.outputs]
+            t = perf_counter()
+            # update device
+            if d.delay is None: d.update_output_ports(system.time)
+            else: system.update_delayed(d)
+            t = perf_counter() - t
+            # count the output ports set to a new state
+            n = sum([(o._state is not s or o._bits is not b) and not o.up_to_date
+                for o, s, b in O])
+            # record statistics
+            if d not in S: S[d] = [0, 0, 0.0]
+            s = S[d]
+            s[0] += 1
+            s[1] += n
+            s[2] += t
+        self.steps += 1
+        # done
+        return
+
+    def clear(self):
+        self.devices.clear()
+        self.steps = 0
+        # done
+        return
+
+    ##################################################### STATISTICS
+
+    def stats(self):
+        D, C, T = {}, {}, 0.0
+        for k, (d, (updates, changes, time)) in enumerate(self.devices.items()):
+            kind = type(d).__name__
+            # unnamed devices are numbered
+            name = d.name if d.name is not None else f"{kind}#{k}"
+            D[name] = {'class': kind,
+                'updates': updates, 'changes': changes, 'time': time}
+            # sum up by class
+            if kind not in C:
+                C[kind] = {'devices': 0, 'updates': 0, 'changes': 0, 'time': 0.0}
+            c = C[kind]
+            c['devices'] += 1
+            c['updates'] += updates
+            c['changes'] += changes
+            c['time'] += time
+            T += time
+        # done
+        return {'steps': self.steps, 'time': T, 'devices': D, 'classes': C}
+
+    def display(self, n = 10):
+        S = self.stats()
+        total = S['time'] or 1.0
+        print(f"<profiler> {S['steps']} steps, {S['time']:.3f}s in the device updates")
+        # classes sorted by time
+        print(f"  {'class':<16}{'devices':>9}{'updates':>11}{'changes':>11}{'time':>10}{'%':>7}")
+        C = sorted(S['classes'].items(), key = lambda x: -x[1]['time'])
+        for kind, c in C:
+            print(f"  {kind:<16}{c['devices']:>9}{c['updates']:>11}"
+                f"{c['changes']:>11}{c['time']:>10.4f}{100*c['time']/total:>7.1f}")
+        # first 'n' devices sorted by time
+        print(f"  {'device':<16}{'class':>14}{'updates':>11}{'changes':>11}{'time':>10}{'%':>7}")
+        D = sorted(S['devices'].items(), key = lambda x: -x[1]['time'])
+        for name, d in D[:n]:
+            print(f"  {name:<16}{d['class']:>14}{d['updates']:>11}"
+                f"{d['changes']:>11}{d['time']:>10.4f}{100*d['time']/total:>7.1f}")
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+    from gate import gate_and, gate_not
+    from os import devnull
+
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(8, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    for k in range(8):
+        g = ls.add(gate_and(name = f"and{k}"))
+        g.add_input(cnt.Q, [k])
+        g.add_input(clk.Q)
+        n = ls.add(gate_not(name = f"not{k}"))
+        n.add_input(g.Q)
+    ls.profile()
+    ls.open(devnull)
+    ls.run_until(10000)
+    ls.close()
+    ls.profiler.display()
@@ -0,0 +1,334 @@
+# file: ram.py
+# content: RAM
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the RAM device has one set of address input ports, one set of
+    data input ports, a write enable input labelled "we", a clock
+    input labelled "clk" and one output port, the data.
+
+    the least significant bit of the address (and of the data) is
+    defined by the first input port that is instantiated, like for
+    the rom device (see rom.py). the data inputs concatenation must
+    match the width of the words given by the parameter "bits".
+
+    the word at the input address is copied to the output as soon as
+    the address is updated (like the rom). the data inputs are written
+    at the input address on each rising edge of the clock when the
+    write enable is high (always when there is no write enable input),
+    and the output shows the new word at once. if the address contains
+    a 'U', nothing is written and all the output bits are set to 'U'.
+
+    the memory is sparse: the address space is split into pages of
+    2^page words and a page is only allocated when one of its words is
+    written. the unwritten words read the filling word, which depends
+    on the parameter "filling" ('0', '1', 'U' or 'R', the same as for
+    startup_bits(): 'R' gives one random word for the whole memory).
+    a 32 bits address space only costs the pages written. the words
+    of up to 32 bits are held by arrays of machine words (value and
+    mask in the same integer), the wider words by lists. the words are
+    at most 64 bits wide (the width of the NumPy images).
+
+    the pages are copy-on-write: snapshot() returns the current page
+    table without copying any page, and a page shared with a snapshot
+    is only copied when it is next written. restore() goes back to a
+    snapshot, which remains valid and can be restored again. the
+    checkpoints of the logic system save and restore the contents
+    with the snapshots (see save_state()).
+
+    the contents can be preloaded from a table string, a packed image
+    (bytes, bytearray, mmap or NumPy array, see rom.py) or a ROM image
+    file (see loader.py).
+
+    the compiler calls the ram update() method; the batch system
+    refuses the ram since the contents would be shared by all the
+    lanes.
+
+    The startup bit values are always 'U'.
+'''
+
+from toolbox import *
+from core import logic_device
+from numpy import ndarray, frombuffer, zeros, uint8, uint64, array as np_array
+from array import array
+
+######################################################################
+#                                                                  RAM
+######################################################################
+
+
+class ram(logic_device):
+
+    clk = None
+    we = None
+
+    def __init__(
+            self,
+            bits=8,         # word width
+            name=None,      # None means no export
+            page=12,        # number of address bits of a page
+            filling='U',    # filling mode of the unwritten words
+    ):
+        # call parent class constructor
+        logic_device.__init__(self, name)
+        # the images are decoded in machine words
+        if not 0 < bits <= 64:
+            raise ValueError(f"ram words of {bits} bits are not supported")
+        # record configuration
+        self.configuration = bits, page
+        # word of the unwritten addresses (value | mask << bits)
+        value, mask = state_to_bits(startup_bits(bits, filling))
+        self.fill = value | mask << bits
+        # page type (None for lists)
+        self.kind = 'Q' if bits <= 32 else None
+        # page table and pages not shared with a snapshot
+        self.pages, self.owned = {}, set()
+        # instantiate output port (startup is always 'U')
+        self.Q = self.add_output_port(bits, "Q", None, None, 'U')
+        # declare address and data input lists
+        self.A, self.D = [], []
+        # done
+        return
+
+    def add_address(self, port, subset=None):
+        self.A.append(self.add_input_port(port, "A", subset))
+        # done
+        return
+
+    def add_input(self, port, subset=None):
+        self.D.append(self.add_input_port(port, "D", subset))
+        # done
+        return
+
+    def add_we(self, port, subset=None):
+        self.we = self.add_input_port(port, "we", subset)
+        # done
+        return
+
+    def add_clk(self, port, subset=None):
+        self.clk = self.add_input_port(port, "clk", subset)
+        # done
+        return
+
+    ##################################################### PAGES
+
+    # new page filled with the filling word
+    def blank(self):
+        bits, page = self.configuration
+        if self.kind is None: return [self.fill] * (1 << page)
+        # done
+        return array(self.kind, [self.fill]) * (1 << page)
+
+    # page 'n' ready for writing (copied when shared)
+    def page_of(self, n):
+        if n in self.owned: return self.pages[n]
+        page = self.pages.get(n)
+        page = self.blank() if page is None else page[:]
+        self.pages[n] = page
+        self.owned.add(n)
+        # done
+        return page
+
+    # word of 'address' in integer form
+    def read_bits(self, address):
+        # get configuration
+        bits, page = self.configuration
+        # find page
+        P = self.pages.get(address >> page)
+        word = self.fill if P is None else P[address & ((1 << page) - 1)]
+        # done
+        return word & ((1 << bits) - 1), word >> bits
+
+    # word of 'address' in string form
+    def read(self, address):
+        bits, page = self.configuration
+        # done
+        return bits_to_state(*self.read_bits(address), bits)
+
+    def write_bits(self, address, value, mask=0):
+        # get configuration
+        bits, page = self.configuration
+        ones = (1 << bits) - 1
+        # write word
+        P = self.page_of(address >> page)
+        P[address & ((1 << page) - 1)] = value & ones | (mask & ones) << bits
+        # done
+        return
+
+    def write(self, address, state):
+        self.write_bits(address, *state_to_bits(state))
+        # done
+        return
+
+    ##################################################### PRELOAD
+
+    # words of an image in integer form (value | mask << bits)
+    def words(self, image, width=None):
+        # get configuration
+        bits, page = self.configuration
+        ones = (1 << bits) - 1
+        width = bits if width is None else width
+        # table string
+        if isinstance(image, str):
+            W = [state_to_bits(image[k:k + width])
+                for k in range(0, len(image), width)]
+            W = [v & ones | (m & ones) << bits for v, m in W]
+        # NumPy array items
+        elif isinstance(image, ndarray):
+            W = image.astype(uint64) & uint64(ones)
+        # words of whole bytes
+        else:
+            step = (width + 7) // 8
+            n = len(image) // step
+            if step > 8:
+                W = [int.from_bytes(image[k * step:(k + 1) * step], 'little') & ones
+                    for k in range(n)]
+            else:
+                # widen the words to 8 bytes
+                B = zeros((n, 8), uint8)
+                B[:, :step] = frombuffer(image, uint8, n * step).reshape(n, step)
+                W = B.view('<u8').ravel() & uint64(ones)
+        # machine words pages
+        if self.kind is not None: return np_array(W, uint64)
+        # lists pages
+        if isinstance(W, ndarray): W = W.tolist()
+        # done
+        return W
+
+    # write the words of an image from 'address' on
+    def preload(self, image, address=0, width=None):
+        # get configuration
+        bits, page = self.configuration
+        size = 1 << page
+        W = self.words(image, width)
+        k = 0
+        while k < len(W):
+            n, o = (address + k) >> page, (address + k) & (size - 1)
+            m = min(size - o, len(W) - k)
+            # page type
+            C = W[k:k + m]
+            if self.kind is not None: C = array(self.kind, C.tobytes())
+            # a whole page is not copied
+            if m == size:
+                self.pages[n] = C
+                self.owned.add(n)
+            else: self.page_of(n)[o:o + m] = C
+            k += m
+        # done
+        return
+
+    # write the words of a ROM image file (see loader.py)
+    def load_image(self, fp, fmt=None, address=0):
+        from loader import load_image
+        image, width = load_image(fp, fmt, self.configuration[0])
+        self.preload(image, address, width)
+        # done
+        return
+
+    ##################################################### SNAPSHOTS
+
+    def snapshot(self):
+        # all the pages become shared
+        self.owned.clear()
+        # done
+        return dict(self.pages)
+
+    def restore(self, snapshot):
+        self.pages, self.owned = dict(snapshot), set()
+        # done
+        return
+
+    def save_state(self):
+        return self.snapshot()
+
+    def load_state(self, state):
+        self.restore(state)
+        # done
+        return
+
+    ##################################################### UPDATE
+
+    # concatenation of the ports states in integer form
+    def concat(self, P):
+        value, mask, n = 0, 0, 0
+        for p in P:
+            v, m = p.get_bits()
+            value, mask = value | v << n, mask | m << n
+            n += p.size()
+        # done
+        return value, mask
+
+    def update(self, timeStamp):
+        # get configuration
+        bits, page = self.configuration
+        # build address in integer form
+        address, mask = self.concat(self.A)
+        # write on rising edge of clock
+        if self.clk and self.clk.rising and not mask:
+            if self.we is None or self.we.get_bits() == (1, 0):
+                self.write_bits(address, *self.concat(self.D))
+        # check for un-intialised bit(s)
+        if mask: self.Q.set_bits(0, (1 << bits) - 1)
+        else: self.Q.set_bits(*self.read_bits(address))
+        # done
+        return
+
+    def display(self, tab):
+        # get name
+        name = self.name
+        # get configuration
+        bits, page = self.configuration
+        # get current value
+        value = f"Q={self.Q.get()[::-1]}"
+        # get address width
+        n = sum([a.size() for a in self.A])
+        # display
+        print(f"<random access memory> {name}")
+        print(f"  length 2^{n}x{bits}")
+        print(f"  pages {len(self.pages)} of {1 << page} words, {len(self.owned)} owned")
+        if self.clk:
+            print(f"  clock {self.clk.get()}", end="")
+            if self.clk.rising:
+                print(", rising", end="")
+            print()
+        if self.we:
+            print(f"  write enable {self.we.get()}")
+        print(f"  address {NUL.join([a.get() for a in self.A])[::-1]}")
+        print(f"  input D={NUL.join([d.get() for d in self.D])[::-1]}")
+        print(f"  value {value}")
+        # done
+        return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from counter import counter
+    from clock import clock
+    from gate import gate_not
+
+    # write the counter value at the counter address, every other
+    # clock cycle, then read the memory back
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(20, 15, 5, 1, name = "reset"))
+    cnt = ls.add(counter(5, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    ntclk = ls.add(gate_not(name = "not_clock"))
+    ntclk.add_input(clk.Q)
+    mem = ls.add(ram(4, name = 'mem', page = 2))
+    mem.add_address(cnt.Q, [0, 1, 2, 3])
+    mem.add_input(cnt.Q, [1, 2, 3, 4])
+    mem.add_we(cnt.Q, [4])
+    mem.add_clk(ntclk.Q)
+    mem.preload('1111' * 4, 8)
+    ls.display()
+    ls.open("./export.vcd")
+    ls.run_until(700)
+    ls.close()
+    mem.display(0)
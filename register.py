@@ -17,6 +17,7 @@
 
 from toolbox import *
 from core import logic_device
+from numpy import where
 
 ######################################################################
 ###                                                           REGISTER
@@ -76,6 +77,57 @@ class register(logic_device):
         # done
         return
 
+    def compile(self, c):
+        # get configuration
+        bits = self.configuration
+        # get output names
+        v, m = c.v(self.Q), c.m(self.Q)
+        # only single bit clock and clear are compiled
+        for p in [self.clr, self.clk]:
+            if p and p.size() > 1: return False
+        # concatenate input states
+        av, am, n = c.concat(self.A)
+        # the input must match the output width
+        if self.clk and not n == bits: return False
+        # asynchronous clear on active low
+        k = f"if"
+        if self.clr:
+            c.emit(f"if not ({c.v(self.clr)} | {c.m(self.clr)}):")
+            c.emit(f"    {v}, {m} = 0, 0")
+            k = f"elif"
+        # update on rising edge of clock
+        if self.clk:
+            c.emit(f"{k} {c.r(self.clk)}:")
+            c.emit(f"    {v}, {m} = {av}, {am}")
+        # done
+        return True
+
+    def batch(self, b, timeStamp):
+        # get configuration
+        bits = self.configuration
+        # only single bit clock and clear are batched
+        for p in [self.clr, self.clk]:
+            if p and p.size() > 1: return False
+        # get output state
+        v, m = b.get(self.Q)
+        # asynchronous clear on active low
+        clear = False
+        if self.clr:
+            cv, cm = b.get(self.clr)
+            clear = (cv | cm) == 0
+        # update on rising edge of clock
+        if self.clk:
+            # concatenate input states
+            av, am, n = b.concat(self.A)
+            # the input must match the output width
+            if not n == bits: return False
+            rising = b.rising(self.clk) & ~clear
+            v, m = where(rising, av, v), where(rising, am, m)
+        # update output value
+        b.set(self.Q, where(clear, 0, v), where(clear, 0, m))
+        # done
+        return True
+
     def display(self, tab):
         # get name
         name = self.name
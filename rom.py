@@ -45,15 +45,56 @@
 
     to load a table from a file, use the load_table() function
     from the toolbox module.
+
+    the table can also be a packed store: bytes, bytearray, mmap
+    (see map_image()) or NumPy array. the words of a bytes-like
+    store are made of whole bytes (little endian: 1 byte for 1 to
+    8 bits, 2 bytes for 9 to 16 bits, ...) and the words of a NumPy
+    array are its items. the word of an address is read from its
+    offset in the store: the table is neither copied nor expanded
+    and the missing words all read the filling word.
+
+    the address decoding can be memoized by the lut cache of the
+    logic system (see logic_system.set_cache()).
 '''
 
 from toolbox import *
 from core import logic_device
 from numpy import log as ln
+from numpy import where, arange, ndarray
 from math import ceil
+from mmap import mmap, ACCESS_READ
 
 _DISPLAY_MAX = 80  # maximum characters per lines for table display
 
+######################################################################
+#                                                               DECODE
+######################################################################
+# output word of the address string (least significant bit first)
+
+
+def decode(table, bits, address_string):
+    # check for un-intialised bit(s)
+    if 'U' in address_string: return UKN * bits
+    # convert string to integer
+    address_value = int(address_string[::-1], 2)
+    # done
+    return table[address_value * bits:(address_value + 1) * bits]
+
+######################################################################
+#                                                            MAP_IMAGE
+######################################################################
+# map a binary image file in memory (read only)
+
+
+def map_image(fp):
+    fh = open(fp, 'rb')
+    image = mmap(fh.fileno(), 0, access = ACCESS_READ)
+    # the map remains valid after closing the file
+    fh.close()
+    # done
+    return image
+
 ######################################################################
 #                                                                  ROM
 ######################################################################
@@ -63,23 +104,35 @@ _DISPLAY_MAX = 80  # maximum characters per lines for table display
 
 class rom(logic_device):
 
+    # shared lut cache (None is no cache)
+    cache = None
+
     def __init__(
             self,
-            table='1110',   # the table is always stored as a binary string
+            table='1110',   # binary string or packed store (see above)
             bits=1,        # the table is subdivided in words of length 'bits'
             name=None,     # None means no export
             filling='U',    # filling mode for data padding
     ):
         # call parent class constructor
         logic_device.__init__(self, name)
+        # packed store (None for the string table)
+        self.store = None if isinstance(table, str) else table
         # find number of words
-        words = ceil(len(table) / bits)
+        if self.store is None: words = ceil(len(table) / bits)
+        # NumPy array items or words of whole bytes
+        else:
+            self.step = None if isinstance(table, ndarray) else (bits + 7) // 8
+            words = len(table) if self.step is None else ceil(len(table) / self.step)
+            self.words = words
+            # word of the missing addresses
+            self.fill = state_to_bits(startup_bits(bits, filling))
         # express the nn in powers of 2
         nn = ceil(ln(words) / ln(2))
         # compute expansion length
         n = (2**nn - words) * bits
         # expand the table up to 2^nn
-        table += startup_bits(n, filling)
+        if self.store is None: table += startup_bits(n, filling)
         # record configuration
         self.configuration = nn, bits, table
         # instantiate output port (startup is always 'U')
@@ -92,22 +145,101 @@ class rom(logic_device):
         # done
         return
 
+    # word of 'address' in integer form
+    def read_bits(self, address):
+        # get configuration
+        nn, bits, table = self.configuration
+        # string table
+        if self.store is None:
+            return state_to_bits(table[address * bits:(address + 1) * bits])
+        # missing words
+        if address >= self.words: return self.fill
+        # NumPy array items
+        ones = (1 << bits) - 1
+        if self.step is None: return int(table[address]) & ones, 0
+        # words of whole bytes
+        k = address * self.step
+        # done
+        return int.from_bytes(table[k:k + self.step], 'little') & ones, 0
+
+    # word of 'address' in string form
+    def read(self, address):
+        # get configuration
+        nn, bits, table = self.configuration
+        # string table
+        if self.store is None: return table[address * bits:(address + 1) * bits]
+        # done
+        return bits_to_state(*self.read_bits(address), bits)
+
     def update(self, timeStamp):
         # get configuration
         bits, bits, table = self.configuration
+        # packed store: build address in integer form
+        if self.store is not None:
+            value, mask, n = 0, 0, 0
+            for p in self.inputs:
+                v, m = p.get_bits()
+                value, mask = value | v << n, mask | m << n
+                n += p.size()
+            # check for un-intialised bit(s)
+            if mask: self.Q.set_bits(0, (1 << bits) - 1)
+            else: self.Q.set_bits(*self.read_bits(value))
+            return
         # build address string from input ports
         address_string = NUL.join([p.get() for p in self.inputs])
-        # check for un-intialised bit(s)
-        if 'U' in address_string:
-            self.Q.set(UKN * bits)
-            return
-        # convert string to integer
-        address_value = int(address_string[::-1], 2)
         # update output value
-        self.Q.set(table[address_value * bits:(address_value + 1) * bits])
+        if self.cache is None: self.Q.set(decode(table, bits, address_string))
+        else: self.Q.set(self.cache.call(decode, table, bits, address_string))
         # done
         return
 
+    # the string table can hold multi-valued states
+    def multi_valued(self):
+        nn, bits, table = self.configuration
+        # done
+        return self.store is None and is_multi_valued(table)
+
+    def compile(self, c):
+        # get configuration
+        nn, bits, table = self.configuration
+        # get output names
+        v, m = c.v(self.Q), c.m(self.Q)
+        # address is required
+        if not self.inputs: return False
+        # concatenate address inputs
+        av, am, n = c.concat(self.inputs)
+        # the address must remain within the table
+        if n > nn: return False
+        # build table of words in integer form
+        T = [self.read_bits(k) for k in range(2**nn)]
+        T = c.const(tuple(T))
+        # un-intialised address bit(s)
+        c.emit(f"if {am}: {v}, {m} = 0, {(1 << bits) - 1}")
+        c.emit(f"else: {v}, {m} = {T}[{av}]")
+        # done
+        return True
+
+    def batch(self, b, timeStamp):
+        # get configuration
+        nn, bits, table = self.configuration
+        # address is required
+        if not self.inputs: return False
+        # concatenate address inputs
+        av, am, n = b.concat(self.inputs)
+        # the address must remain within the table
+        if n > nn: return False
+        # get the table of each lane
+        TV, TM = b.table(self)
+        lanes = 0 if len(TV) == 1 else arange(b.lanes)
+        v, m = TV[lanes, av], TM[lanes, av]
+        # un-intialised address bit(s)
+        unknown = am != 0
+        v, m = where(unknown, 0, v), where(unknown, (1 << bits) - 1, m)
+        # update output value
+        b.set(self.Q, v, m)
+        # done
+        return True
+
     def display(self, tab):
         # get name
         name = self.name
@@ -125,7 +257,7 @@ class rom(logic_device):
         # scan through table
         for i in range(2**nn):
             # build up display string
-            s += f"{table[i*bits:(i+1)*bits][::-1]}{SPC}"
+            s += f"{self.read(i)[::-1]}{SPC}"
             # limit lines up to '_DISPLAY_MAX' characters
             if len(s) > _DISPLAY_MAX:
                 print(f"{s}")
@@ -0,0 +1,144 @@
+# file: sweep.py
+# content: parameter sweeps on a process pool
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    a sweep runs one simulation per point of a grid of parameters on
+    a pool of processes. each simulation is built by a 'factory': a
+    function defined at the module level (it must be picklable) that
+    takes the grid parameters as keyword arguments and returns a
+    logic system, the same way the test code of each module does.
+
+    each run can write its own VCD file (the file path is formatted
+    with the parameters) and can collect the transitions of some
+    ports given by their VCD labels (e.g. "counter_Q"). the results
+    are yielded as soon as each run completes.
+'''
+
+from toolbox import *
+from os import devnull
+from time import perf_counter
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+######################################################################
+#                                                            MAKE_GRID
+######################################################################
+# build the list of all the combinations of the parameters values:
+# make_grid(period = [10, 20], bits = [2, 4]) gives four points.
+
+
+def make_grid(**axes):
+    names = list(axes)
+    return [dict(zip(names, values)) for values in product(*axes.values())]
+
+######################################################################
+#                                                            FIND_PORT
+######################################################################
+# find a port from its VCD label "device_port"
+
+
+def find_port(device, label):
+    for d in device.devices:
+        for p in d.outputs + d.inputs:
+            if f"{d.name}_{p.name}" == label: return p
+        p = find_port(d, label)
+        if p: return p
+    # not found
+    return None
+
+######################################################################
+#                                                            SWEEP_RUN
+######################################################################
+# run one point of the sweep (this is executed by the workers)
+
+
+def sweep_run(factory, params, until, fp = None, traces = None):
+    start = perf_counter()
+    # build system
+    ls = factory(**params)
+    # open export file (or discard the export)
+    fp = fp.format(**params) if fp else None
+    ls.open(fp if fp else devnull)
+    # simple run
+    if not traces:
+        ls.run_until(until)
+        ls.close()
+        return {
+            'params': params,
+            'file': fp,
+            'traces': {},
+            'time': perf_counter() - start,
+            }
+    # find traced ports
+    P = {}
+    for label in traces:
+        P[label] = find_port(ls, label)
+        if P[label] is None:
+            raise KeyError(f"port {label} not found")
+    # record initial states
+    T = {label: [(ls.time, p.get())] for label, p in P.items()}
+    # run event by event
+    while ls.time < until:
+        t = ls.next_event()
+        if t is None or t > until:
+            ls.run_until(until)
+            break
+        ls.run_step(t)
+        # record transitions
+        for label, p in P.items():
+            state = p.get()
+            if state == T[label][-1][1]: continue
+            T[label].append((t, state))
+    ls.close()
+    # done
+    return {
+        'params': params,
+        'file': fp,
+        'traces': T,
+        'time': perf_counter() - start,
+        }
+
+######################################################################
+#                                                                SWEEP
+######################################################################
+# run all the points of the grid on a pool of 'workers' processes
+# (None uses all the cores). the results are yielded as they come.
+
+
+def sweep(factory, grid, until, fp = None, traces = None, workers = None):
+    with ProcessPoolExecutor(workers) as pool:
+        F = [pool.submit(sweep_run, factory, params, until, fp, traces)
+            for params in grid]
+        for f in as_completed(F):
+            yield f.result()
+    # done
+    return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+
+def _counter_system(period, bits):
+
+    from core import logic_system
+    from counter import counter
+    from clock import clock
+
+    ls = logic_system()
+    clk = ls.add(clock(period, period // 2, period // 2, name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(bits, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    return ls
+
+
+if __name__ == "__main__":
+
+    grid = make_grid(period = [10, 20, 40], bits = [2, 4])
+    for r in sweep(_counter_system, grid, 1000, traces = ["counter_Q"]):
+        p, T = r['params'], r['traces']['counter_Q']
+        print(f"{p} {len(T)} transitions in {r['time']:.3f}s")
@@ -0,0 +1,102 @@
+# file: test_checkpoint.py
+# content: regression tests of the checkpoints
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    a run restored from a checkpoint into a system built again in the
+    same process must continue the export file of the checkpoint with
+    the same signal identifiers.
+
+    usage: python -m pytest tests
+'''
+
+from sys import path
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from os.path import exists
+from pytest import raises
+from core import logic_system
+from clock import clock
+from counter import counter
+from register import register
+from vcd import vcd_reader, vcd_diff
+
+######################################################################
+#                                                               SYSTEM
+######################################################################
+
+
+def build():
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(4, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    reg = ls.add(register(4, name = "register"))
+    reg.add_input(cnt.Q)
+    reg.add_clk(clk.Q)
+    reg.add_clr(rst.Q)
+    # done
+    return ls
+
+######################################################################
+#                                                                TESTS
+######################################################################
+
+
+def test_restore_same_process(tmp_path):
+    fa, fb = f"{tmp_path}/a.vcd", f"{tmp_path}/b.vcd"
+    fc = f"{tmp_path}/b.checkpoint"
+    # straight run
+    ls = build()
+    ls.open(fa)
+    ls.run_until(400)
+    ls.close()
+    # run, checkpoint and branch
+    ls = build()
+    ls.open(fb)
+    ls.run_until(150)
+    ls.checkpoint(fc)
+    ls.run_until(250)
+    ls.close()
+    # continue from the checkpoint with a new system
+    ls = build()
+    ls.restore(fc)
+    ls.run_until(400)
+    ls.close()
+    # the identifiers of the changes are declared in the header
+    fh = vcd_reader(fb)
+    C = list(fh.changes())
+    assert all([i in fh.ids for t, i, v in C])
+    L = set(fh.labels)
+    fh.close()
+    # the restored run is exported up to the end
+    assert C[-1][0] > 250
+    # same signals
+    fh = vcd_reader(fa)
+    assert set(fh.labels) == L and 'SYSTEM.register.register_Q' in L
+    fh.close()
+    # same changes
+    assert vcd_diff(fa, fb) == {}
+
+
+def test_waveform(tmp_path):
+    fp, fc = f"{tmp_path}/a.wave", f"{tmp_path}/a.checkpoint"
+    for depth in (None, 4):
+        ls = build()
+        ls.open(fp, depth = depth)
+        ls.run_until(150)
+        # refused before the checkpoint is written
+        with raises(ValueError): ls.checkpoint(fc)
+        assert not exists(fc)
+        ls.close()
+    # the export is not continued in a waveform file
+    ls = build()
+    ls.open(f"{tmp_path}/b.vcd")
+    ls.run_until(150)
+    ls.checkpoint(fc)
+    ls.close()
+    with raises(ValueError): build().restore(fc, fp)
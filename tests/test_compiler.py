@@ -0,0 +1,92 @@
+# file: test_compiler.py
+# content: regression tests of the compiled engine
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the compiled engine must write the same VCD as the interpreted
+    engine. the gates with mismatched input widths are interpreted
+    and change the width of their output at run time.
+
+    usage: python -m pytest tests
+'''
+
+from sys import path
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from toolbox import EOL
+from core import logic_system, logic_device, logic_port
+from clock import clock
+from counter import counter
+from gate import gate_and, gate_nand, gate_or, gate_eor, gate_not
+from compiler import compiled_system
+
+######################################################################
+#                                                               SYSTEM
+######################################################################
+
+
+class wide(logic_device):
+
+    def __init__(self, name = None):
+        logic_device.__init__(self, name)
+        # one bit gate driven by two bits inputs
+        self.g = self.add(gate_and(1, name = "g"))
+        # linked output port
+        self.Q = self.add_output_port(1, "Q", self.g.Q)
+        # done
+        return
+
+    def add_input(self, port, subset = None):
+        A = self.add_input_port(port, "A", subset)
+        self.g.add_input(A)
+        # done
+        return
+
+
+def build():
+    # same signal identifiers for all the runs
+    logic_port.signal_counter = 0
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(4, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    for k, gate in enumerate([gate_and, gate_nand, gate_or, gate_eor]):
+        # narrower inputs
+        g = ls.add(gate(3, name = f"n{k}"))
+        g.add_input(cnt.Q, [0, 1])
+        g.add_input(cnt.Q, [1, 2])
+        # wider inputs
+        g = ls.add(gate(2, name = f"w{k}"))
+        g.add_input(cnt.Q, [0, 1, 2])
+        g.add_input(cnt.Q, [1, 2, 3])
+    n = ls.add(gate_not(2, name = "not"))
+    n.add_input(cnt.Q, [0])
+    w = ls.add(wide(name = "wide"))
+    w.add_input(cnt.Q, [0, 1])
+    x = ls.add(gate_not(name = "x"))
+    x.add_input(w.Q)
+    # done
+    return ls
+
+######################################################################
+#                                                                TESTS
+######################################################################
+
+
+def test_width_mismatch(tmp_path):
+    fa, fb = f"{tmp_path}/a.vcd", f"{tmp_path}/b.vcd"
+    ls = build()
+    ls.open(fa)
+    ls.run_until(300)
+    ls.close()
+    ls = build()
+    ls.open(fb)
+    compiled_system(ls).run_until(300)
+    ls.close()
+    # same VCD (except the date)
+    A, B = open(fa).read().split(EOL), open(fb).read().split(EOL)
+    assert A[2:] == B[2:]
@@ -0,0 +1,63 @@
+# file: test_delay.py
+# content: regression tests of the device delays
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    an inertial delay filters out the pulses shorter than the delay:
+    the output of a delayed gate which inputs change faster than the
+    delay must still follow the stable states of the undelayed gate.
+
+    usage: python -m pytest tests
+'''
+
+from sys import path
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from core import logic_system
+from clock import clock
+from gate import gate_or
+
+######################################################################
+#                                                               SYSTEM
+######################################################################
+
+
+def run(fp, delay, inertial = True):
+    ls = logic_system()
+    slow = ls.add(clock(40, 20, 10, name = 'slow'))
+    fast = ls.add(clock(2, 1, 1, name = 'fast'))
+    g = ls.add(gate_or(name = 'or'))
+    g.add_input(slow.Q)
+    g.add_input(fast.Q)
+    g.set_delay(delay, inertial)
+    ls.open(fp)
+    T = []
+    for t in range(200):
+        ls.run_step()
+        T.append(g.Q.get())
+    ls.close()
+    # done
+    return T
+
+######################################################################
+#                                                                TESTS
+######################################################################
+
+
+def test_inertial(tmp_path):
+    A = run(f"{tmp_path}/a.vcd", None)
+    B = run(f"{tmp_path}/b.vcd", 3)
+    # the output is set
+    assert '1' in B
+    # the states held for the delay are delivered
+    for t in range(3, len(A)):
+        if A[t - 3:t + 1] == ['1'] * 4: assert B[t] == '1'
+
+
+def test_transport(tmp_path):
+    A = run(f"{tmp_path}/a.vcd", None)
+    B = run(f"{tmp_path}/b.vcd", 3, False)
+    # the delayed output follows the output 3 ns later
+    assert A[:-3] == B[3:]
@@ -0,0 +1,136 @@
+# file: test_hierarchy.py
+# content: regression tests of the devices made of sub-devices
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the half adder device is made of two gate sub-devices which
+    outputs are linked to the half adder outputs. the changes of the
+    gates and of the half adder outputs must be exported at the same
+    steps as the changes of the inputs of the gate that follows the
+    half adder.
+
+    usage: python -m pytest tests
+'''
+
+from sys import path
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from toolbox import EOL
+from core import logic_system, logic_device, logic_port
+from clock import clock
+from counter import counter
+from gate import gate_eor, gate_and, gate_or
+from vcd import vcd_reader
+
+######################################################################
+#                                                           HALF_ADDER
+######################################################################
+
+
+class half_adder(logic_device):
+
+    def __init__(self, name = None):
+        logic_device.__init__(self, name)
+        # sub-devices
+        self.x = self.add(gate_eor(name = "x"))
+        self.y = self.add(gate_and(name = "y"))
+        # linked output ports
+        self.S = self.add_output_port(1, "S", self.x.Q)
+        self.C = self.add_output_port(1, "C", self.y.Q)
+        # done
+        return
+
+    def add_input(self, port, subset = None):
+        A = self.add_input_port(port, "A", subset)
+        self.x.add_input(A)
+        self.y.add_input(A)
+        # done
+        return
+
+
+def build():
+    # same signal identifiers for all the runs
+    logic_port.signal_counter = 0
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(20, 15, 5, 1, name = "reset"))
+    cnt = ls.add(counter(2, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    ha = ls.add(half_adder(name = "ha"))
+    ha.add_input(cnt.Q, [0])
+    ha.add_input(cnt.Q, [1])
+    out = ls.add(gate_or(name = "out"))
+    out.add_input(ha.S)
+    out.add_input(ha.C)
+    # done
+    return ls
+
+
+# times of the changes of each signal (after the first step)
+def changes(fp):
+    fh = vcd_reader(fp)
+    T = {label: [] for label in fh.labels}
+    for time, ident, value in fh.changes():
+        if time: T[fh.labels[fh.ids[ident]]].append(time)
+    fh.close()
+    # done
+    return T
+
+######################################################################
+#                                                                TESTS
+######################################################################
+
+
+def check(T):
+    S, C = T['SYSTEM.ha.ha_S'], T['SYSTEM.ha.ha_C']
+    # the half adder outputs change
+    assert S and C
+    # with the gates
+    assert T['SYSTEM.ha.x.x_Q'] == S
+    assert T['SYSTEM.ha.y.y_Q'] == C
+    # and the inputs of the next gate
+    assert T['SYSTEM.out.out_A'] == S
+    assert T['SYSTEM.out.out_A1'] == C
+
+
+def test_hierarchy(tmp_path):
+    fp = f"{tmp_path}/ha.vcd"
+    ls = build()
+    ls.open(fp)
+    ls.run_until(200)
+    ls.close()
+    T = changes(fp)
+    check(T)
+    # first changes of the sum
+    assert T['SYSTEM.ha.ha_S'][:3] == [3, 32, 72]
+
+
+def test_hierarchy_compiled(tmp_path):
+    from compiler import compiled_system
+    fp = f"{tmp_path}/ha.vcd"
+    ls = build()
+    ls.open(fp)
+    compiled_system(ls).run_until(200)
+    ls.close()
+    T = changes(fp)
+    check(T)
+    assert T['SYSTEM.ha.ha_S'][:3] == [3, 32, 72]
+
+
+def test_hierarchy_batch(tmp_path):
+    from batch import batch_system
+    fp, fb = f"{tmp_path}/ha.vcd", f"{tmp_path}/ha_batch.vcd"
+    ls = build()
+    ls.open(fp)
+    ls.run_until(200)
+    ls.close()
+    # same VCD from the first lane (except the date)
+    b = batch_system(build(), 2)
+    b.open(0, fb)
+    b.run_until(200)
+    b.close()
+    A, B = open(fp).read().split(EOL), open(fb).read().split(EOL)
+    assert A[2:] == B[2:]
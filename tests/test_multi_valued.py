@@ -0,0 +1,86 @@
+# file: test_multi_valued.py
+# content: regression tests of the multi-valued states
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the multi-valued states are only held by the string form of the
+    ports: the engines that hold the integer form must refuse them,
+    and the delayed transitions must keep them.
+
+    usage: python -m pytest tests
+'''
+
+from sys import path
+from os.path import dirname, realpath
+path.insert(0, dirname(dirname(realpath(__file__))))
+
+from pytest import raises
+from core import logic_system
+from clock import clock
+from counter import counter
+from bus import tristate, bus
+from toolbox import resolve
+
+######################################################################
+#                                                               SYSTEM
+######################################################################
+
+
+def build(delay = None):
+    ls = logic_system()
+    rst = ls.add(clock(20, 15, 5, 1, name = 'reset'))
+    clk = ls.add(clock(name = 'clock'))
+    cnt = ls.add(counter(4, name = 'counter'))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    b1 = ls.add(tristate(2, name = 'driver'))
+    b1.add_input(cnt.Q, [0, 1])
+    b1.add_enable(cnt.Q, [2])
+    b1.set_delay(delay)
+    b2 = ls.add(tristate(2, name = 'driver'))
+    b2.add_input(cnt.Q, [1, 0])
+    b2.add_enable(cnt.Q, [3])
+    db = ls.add(bus(2, name = 'bus'))
+    db.add_driver(b1.Q)
+    db.add_driver(b2.Q)
+    # done
+    return ls, b1, db
+
+######################################################################
+#                                                                TESTS
+######################################################################
+
+
+def test_resolve():
+    assert resolve('01Z', 'ZZ1') == '011'
+    assert resolve('0LH', '1HH') == 'XWH'
+    assert resolve('ZZ', 'ZZ', 'ZZ') == 'ZZ'
+
+
+def test_engines():
+    from compiler import compiled_system
+    from batch import batch_system
+    from partition import partitioned_system
+    with raises(ValueError): compiled_system(build()[0])
+    with raises(ValueError): batch_system(build()[0], 2)
+    with raises(ValueError): partitioned_system(build()[0])
+
+
+def run(fp, delay):
+    ls, b1, db = build(delay)
+    ls.open(fp)
+    T = []
+    for t in range(300):
+        ls.run_step()
+        T.append(b1.Q.get())
+    ls.close()
+    # done
+    return T
+
+
+def test_delay(tmp_path):
+    A = run(f"{tmp_path}/a.vcd", None)
+    B = run(f"{tmp_path}/b.vcd", 3)
+    # the delayed driver follows the driver 3 ns later (after reset)
+    assert 'ZZ' in A[20:] and A[20:-3] == B[23:]
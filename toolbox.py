@@ -4,6 +4,8 @@
 # author: Roch Schanen
 
 from numpy.random import randint
+from sys import intern
+from collections import OrderedDict
 
 ######################################################################
 #                                                              SYMBOLS
@@ -15,9 +17,22 @@ EOL, SPC, NUL, TAB = f'\n', f' ', f'', f'\t'
 # bit representation
 LOW, HGH, UKN = f'0', f'1', f'U'
 
+# multi-valued bit representation
+CNF, HIZ, WEK, WLO, WHI, DNC = f'X', f'Z', f'W', f'L', f'H', f'-'
+
+# all states (IEEE 1164 order)
+STATES = f'UX01ZWLH-'
+
 # load table parsing symbols (local symbols)
 _COM, _SEP = f'#', f'='
 
+# bits conversion tables (local symbols)
+_VAL = str.maketrans(STATES, '000100000')
+_MSK = str.maketrans(STATES, '110011111')
+
+# states other than 0, 1 and U (local symbol)
+_STD = str.maketrans(NUL, NUL, '01U')
+
 ######################################################################
 #                                                       NAME_DUPLICATE
 ######################################################################
@@ -35,8 +50,8 @@ def name_duplicate(objects, name):
     while newname in names:
         newname = f"{name}{counter}"
         counter += 1
-    # done
-    return newname
+    # done (names are shared)
+    return intern(newname)
 
 ######################################################################
 #                                                          RANDOM_BITS
@@ -64,6 +79,7 @@ def startup_bits(bits=1, behav='U'):
         '0': LOW * bits,
         '1': HGH * bits,
         'U': UKN * bits,
+        'Z': HIZ * bits,
         'R': random_bits(bits),
     }[behav]
 
@@ -73,8 +89,8 @@ def startup_bits(bits=1, behav='U'):
 
 
 def load_table(fp):
-    # initialise
-    table, base, bits, line_number = NUL, 16, 8, 0
+    # initialise (the words are joined at the end)
+    table, base, bits, line_number = [], 16, 8, 0
     # open file
     fh = open(fp, 'r')
     # read file line by line
@@ -115,9 +131,9 @@ def load_table(fp):
             # the most significant bits exceeding the
             # value of 'bits' are simply ignored
             # the bits are stored in reversed order
-            table += f'{int(word, base):0{bits}b}'[::-1][:bits]
+            table.append(f'{int(word, base):0{bits}b}'[::-1][:bits])
     # done
-    return table, bits
+    return NUL.join(table), bits
 
 ######################################################################
 #                                                               HEADER
@@ -162,6 +178,221 @@ def lut(table, *inputs):
     A = [NUL.join(i) for i in zip(*(inputs[::-1]))]
     return NUL.join([UKN if UKN in a else table[int(a, 2)] for a in A])
 
+######################################################################
+#                                                                 BITS
+######################################################################
+# the integer form of a state is a pair of integers (value, mask):
+# bit n of the value is character n of the state string, and bit n
+# of the mask is set when character n is not '0' or '1'. the value
+# bits under the mask are always cleared. the integer form reads
+# all the multi-valued states as 'U'.
+
+
+def state_to_bits(state):
+    s = state[::-1]
+    return int(s.translate(_VAL), 2), int(s.translate(_MSK), 2)
+
+
+def bits_to_state(value, mask, bits):
+    state = f'{value:0{bits}b}'[::-1][:bits]
+    # no unknown bits
+    if not mask:
+        return state
+    # insert unknown bits
+    M = f'{mask:0{bits}b}'[::-1]
+    return NUL.join([UKN if m == HGH else s for s, m in zip(state, M)])
+
+
+def is_multi_valued(state):
+    return bool(state.translate(_STD))
+
+######################################################################
+#                                                             LUT_BITS
+######################################################################
+# integer form of lut(): all the bits of the inputs are computed at
+# once as a sum of the table minterms. the inputs are (value, mask)
+# pairs ordered with the least significant bit first. any unknown
+# input bit makes the corresponding output bit unknown.
+
+
+def lut_bits(table, bits, *inputs):
+    ones = (1 << bits) - 1
+    # collect unknown bits
+    value, mask = 0, 0
+    for v, m in inputs:
+        mask |= m
+    # sum minterms
+    for k, t in enumerate(table):
+        if t == LOW:
+            continue
+        term = ones
+        for j, (v, m) in enumerate(inputs):
+            term &= v if (k >> j) & 1 else ~v
+        if t == HGH:
+            value |= term
+        else:
+            mask |= term
+    # done
+    mask &= ones
+    return value & ones & ~mask, mask
+
+######################################################################
+#                                                          MULTI-VALUED
+######################################################################
+# the nine states are indexed by compact codes: their position in
+# STATES. the tables below are precomputed strings indexed by codes.
+
+# strength reduction of the gate inputs to the codes of U, X, 0, 1
+_X01 = str.maketrans(STATES, '012311231')
+
+
+# resolution of two drivers a, b: RESOLVE[9 * a + b]
+RESOLVE = (
+    'UUUUUUUUU'     # U
+    'UXXXXXXXX'     # X
+    'UX0X0000X'     # 0
+    'UXX11111X'     # 1
+    'UX01ZWLHX'     # Z
+    'UX01WWWWX'     # W
+    'UX01LWLWX'     # L
+    'UX01HWWHX'     # H
+    'UXXXXXXXX'     # -
+    )
+
+# operator tables (built on demand)
+_TABLES = {}
+
+
+def operator_table(table, n):
+    # already built
+    if (table, n) in _TABLES: return _TABLES[table, n]
+    # build the table of the 4**n combinations of U, X, 0, 1 inputs
+    T = []
+    for k in range(4**n):
+        C = [(k >> 2*j) & 3 for j in range(n)]
+        # 'U' is dominant
+        if 0 in C:
+            T.append(UKN)
+            continue
+        # collect the outputs of all the values of the 'X' inputs
+        X = [j for j, c in enumerate(C) if c == 1]
+        a = sum([1 << j for j, c in enumerate(C) if c == 3])
+        R = set()
+        for x in range(1 << len(X)):
+            R.add(table[a + sum([((x >> i) & 1) << j for i, j in enumerate(X)])])
+        # unique output or conflict
+        T.append(R.pop() if len(R) == 1 else CNF)
+    _TABLES[table, n] = NUL.join(T)
+    # done
+    return _TABLES[table, n]
+
+######################################################################
+#                                                           LUT_STATES
+######################################################################
+# multi-valued form of lut(): the inputs are reduced to U, X, 0, 1
+# and the output is read from the operator table. 'U' is dominant.
+
+
+def lut_states(table, *inputs):
+    T = operator_table(table, len(inputs))
+    S = [i.translate(_X01) for i in inputs[::-1]]
+    A = [NUL.join(i) for i in zip(*S)]
+    return NUL.join([T[int(a, 4)] for a in A])
+
+######################################################################
+#                                                              RESOLVE
+######################################################################
+# resolve the states of the drivers of a shared bus. each state is
+# packed in a byte string of codes, and the resolved states in a
+# byte string of codes times 9. the sum of both packed strings (as
+# integers) is the string of the table indices 9 * a + b (there is
+# no carry: the indices are less than 81), which is translated by
+# the resolution table in one call. the drivers are resolved in
+# turn, starting from 'Z'.
+
+# packed codes of the states and of the resolved states (local symbols)
+_CODE = bytes.maketrans(STATES.encode(), bytes(range(9)))
+_CODE9 = bytes.maketrans(STATES.encode(), bytes(range(0, 81, 9)))
+
+# resolution table of the indices 9 * a + b (local symbol)
+_RESOLVE9 = bytes([9 * STATES.index(r) for r in RESOLVE]) + bytes(256 - 81)
+
+# states of the resolved codes (local symbol)
+_STATE9 = bytes.maketrans(bytes(range(0, 81, 9)), STATES.encode())
+
+
+def resolve(*drivers):
+    # no driver
+    if not drivers: return NUL
+    # common width
+    n = min([len(d) for d in drivers])
+    # start from 'Z'
+    r = int.from_bytes((HIZ * n).encode().translate(_CODE9), 'big')
+    # resolve the drivers in turn
+    for d in drivers:
+        a = r + int.from_bytes(d[:n].encode().translate(_CODE), 'big')
+        r = int.from_bytes(a.to_bytes(n, 'big').translate(_RESOLVE9), 'big')
+    # done
+    return r.to_bytes(n, 'big').translate(_STATE9).decode()
+
+######################################################################
+#                                                            LUT_CACHE
+######################################################################
+# bounded memo of the table lookups: the result of a function of the
+# table and the input states (lut(), lut_states(), the ROM decoding)
+# is recorded for its arguments. the least recently used results are
+# evicted when the cache holds more than 'size' results.
+
+
+class lut_cache():
+
+    def __init__(self, size = 4096):
+        # results by arguments, least recently used first
+        self.size, self.results = size, OrderedDict()
+        # statistics
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        # done
+        return
+
+    def call(self, function, *args):
+        key = function, args
+        R = self.results
+        # recorded result
+        if key in R:
+            self.hits += 1
+            R.move_to_end(key)
+            return R[key]
+        # new result
+        self.misses += 1
+        value = R[key] = function(*args)
+        # evict the least recently used result
+        if len(R) > self.size:
+            R.popitem(last = False)
+            self.evictions += 1
+        # done
+        return value
+
+    def clear(self):
+        self.results.clear()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        # done
+        return
+
+    def stats(self):
+        n = self.hits + self.misses
+        return {'size': self.size, 'results': len(self.results),
+            'hits': self.hits, 'misses': self.misses,
+            'evictions': self.evictions,
+            'ratio': self.hits / n if n else 0.0}
+
+    def display(self):
+        S = self.stats()
+        print(f"<lut cache> {S['results']}/{S['size']} results")
+        print(f"  hits {S['hits']} misses {S['misses']} ratio {S['ratio']:.3f}")
+        print(f"  evictions {S['evictions']}")
+        # done
+        return
+
 ######################################################################
 #                                                                 TEST
 ######################################################################
@@ -177,8 +408,34 @@ if __name__ == "__main__":
         # 'startup_bits',
         # 'load_table',
         # 'lut',
+        # 'bits',
+        # 'states',
+        # 'cache',
     ]
 
+    if 'cache' in TESTS:
+
+        cache = lut_cache(2)
+        for S in ["0011", "0101", "0011", "1111", "0101"]:
+            print(cache.call(lut, "0001", S, "1100"))
+        cache.display()
+
+    if 'states' in TESTS:
+
+        print(state_to_bits("1Z0H"))
+        print(lut_states("0001", "01UXZH", "11110L"))
+        print(lut_states("10", "01UXZH-"))
+        print(resolve("ZZ01", "0Z1L", "ZHZZ"))
+
+    if 'bits' in TESTS:
+
+        print(state_to_bits("0110"))
+        print(state_to_bits("1U0U"))
+        print(bits_to_state(6, 0, 4))
+        print(bits_to_state(1, 10, 4))
+        print(lut_bits("0001", 4, state_to_bits("1U10"), (3, 0)))
+        print(lut("0001", "1U10", "1100"))
+
     if 'lut' in TESTS:
 
         print("two single bit inputs")
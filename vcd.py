@@ -0,0 +1,403 @@
+# file: vcd.py
+# content: VCD file writer and reader
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the VCD writer gathers the text written by the logic system in a
+    large buffer and writes it to the file in bulk. a file path that
+    ends with ".gz" is compressed on the fly with gzip (the result
+    can be read by GTKWave directly).
+
+    the writer behaves like a file opened for writing: write(),
+    flush(), tell() and close(). tell() returns the position in the
+    uncompressed text, which is used by the checkpoints.
+
+    the thread writer moves the formatting and the writing of the
+    changes to a background thread: the logic system hands it the
+    changed ports and their states at each step, which are passed
+    in chunks through a bounded queue (the simulation waits when the
+    queue is full). close() waits for the queue to be written and
+    raises the error of the writer thread if any.
+
+    the VCD reader parses the files written by the logic system (one
+    line per time step) as a stream: the steps and the value changes
+    are produced by generators and the memory used does not depend
+    on the size of the file. the values are given as written in the
+    file (most significant bit first).
+
+    vcd_diff() compares two VCD files signal by signal and returns
+    the time of the first divergence of each signal. the signals are
+    matched by their scope path and label (their identifiers depend
+    on the construction of the system).
+
+    usage: python vcd.py [first.vcd second.vcd]
+'''
+
+from toolbox import *
+from gzip import open as gzip_open
+from os import replace
+from threading import Thread
+from queue import Queue
+from itertools import chain
+
+# default buffer size in characters
+_BUFFER = 1 << 20
+
+# copy block size in bytes (local symbol)
+_BLOCK = 1 << 20
+
+######################################################################
+#                                                                 OPEN
+######################################################################
+# open a plain or a compressed file in binary mode
+
+
+def open_file(fp, mode = 'rb', level = 6):
+    if fp.endswith('.gz'): return gzip_open(fp, mode, level)
+    return open(fp, mode)
+
+######################################################################
+#                                                          COPY_PREFIX
+######################################################################
+# copy the first 'position' bytes of the uncompressed text of 'src'
+# into 'dst' (the same path is allowed)
+
+
+def copy_prefix(src, dst, position):
+    # temporary file of the same kind
+    tmp = f"{dst}.tmp.gz" if dst.endswith('.gz') else f"{dst}.tmp"
+    fi, fo = open_file(src), open_file(tmp, 'wb')
+    while position:
+        block = fi.read(min(position, _BLOCK))
+        if not block: break
+        fo.write(block)
+        position -= len(block)
+    fi.close()
+    fo.close()
+    replace(tmp, dst)
+    # done
+    return
+
+######################################################################
+#                                                           VCD_WRITER
+######################################################################
+
+
+class vcd_writer():
+
+    def __init__(self, fp, size = _BUFFER, level = 6, position = None):
+        # record file path
+        self.name = fp
+        # open new file or append from 'position'
+        mode = 'wb' if position is None else 'ab'
+        self.fh = open_file(fp, mode, level)
+        # buffer of strings and its size in characters
+        self.buffer, self.size, self.limit = [], 0, size
+        # position in the uncompressed text
+        self.position = position or 0
+        # statistics
+        self.writes, self.flushes = 0, 0
+        self.closed = False
+        # done
+        return
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        # write buffer in bulk
+        if self.size >= self.limit: self.drain()
+        # done
+        return
+
+    def drain(self):
+        # write buffer content
+        if not self.buffer: return
+        self.fh.write(NUL.join(self.buffer).encode('ascii'))
+        # update position and statistics
+        self.position += self.size
+        self.writes += 1
+        # clear buffer
+        self.buffer.clear()
+        self.size = 0
+        # done
+        return
+
+    def flush(self):
+        self.drain()
+        self.fh.flush()
+        self.flushes += 1
+        # done
+        return
+
+    def tell(self):
+        return self.position + self.size
+
+    def close(self):
+        if self.closed: return
+        self.drain()
+        self.fh.close()
+        self.closed = True
+        # done
+        return
+
+######################################################################
+#                                                        THREAD_WRITER
+######################################################################
+# the items of a chunk are text strings or change records: the time
+# and the list of the changed ports with their states
+
+
+class thread_writer():
+
+    def __init__(self, fh, depth = 64, chunk = 256):
+        # record file handle (any writer)
+        self.fh, self.name = fh, fh.name
+        # queue of chunks and current chunk
+        self.queue, self.depth = Queue(depth), depth
+        self.chunk, self.limit = [], chunk
+        # error of the writer thread
+        self.error = None
+        self.closed = False
+        # start writer thread
+        self.thread = Thread(target = self.run, daemon = True)
+        self.thread.start()
+        # done
+        return
+
+    def run(self):
+        while True:
+            C = self.queue.get()
+            try:
+                # stop
+                if C is None: return
+                # skip all chunks after an error
+                if self.error is None: self.fh.write(NUL.join(map(self.format, C)))
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def format(self, item):
+        # text
+        if isinstance(item, str): return item
+        # change record
+        time, R = item
+        # build the string form of the integer states
+        R = [(p, s if isinstance(s, str) else bits_to_state(*s, p.width)) for p, s in R]
+        S = [f"b{s[::-1]} {p.signal}{SPC}" if len(s) > 1 else f"{s}{p.signal}{SPC}"
+            for p, s in R]
+        # done
+        return f"#{time:04}{SPC}{NUL.join(S)}{EOL}"
+
+    def put(self, item):
+        self.chunk.append(item)
+        # hand the chunk to the writer thread (waits if the queue is full)
+        if len(self.chunk) >= self.limit: self.drain()
+        # done
+        return
+
+    def write(self, text):
+        self.put(text)
+        # done
+        return
+
+    def write_changes(self, time, R):
+        self.put((time, R))
+        # done
+        return
+
+    def drain(self):
+        if self.chunk: self.queue.put(self.chunk)
+        self.chunk = []
+        # surface writer errors
+        if self.error is not None: raise self.error
+        # done
+        return
+
+    def flush(self):
+        # wait for the writer thread
+        self.drain()
+        self.queue.join()
+        if self.error is not None: raise self.error
+        self.fh.flush()
+        # done
+        return
+
+    def tell(self):
+        self.flush()
+        return self.fh.tell()
+
+    def close(self):
+        if self.closed: return
+        self.closed = True
+        # write the queue and stop the writer thread
+        if self.chunk: self.queue.put(self.chunk)
+        self.chunk = []
+        self.queue.put(None)
+        self.thread.join()
+        self.fh.close()
+        # surface writer errors
+        if self.error is not None: raise self.error
+        # done
+        return
+
+######################################################################
+#                                                           VCD_READER
+######################################################################
+
+
+class vcd_reader():
+
+    def __init__(self, fp):
+        # record file path
+        self.name = fp
+        self.fh = open_file(fp, 'rt')
+        # signals: identifiers, widths and scope path labels
+        self.ids, self.widths, self.labels = {}, [], []
+        # read header
+        scopes = []
+        for line in self.fh:
+            T = line.split()
+            if not T: continue
+            if T[0] == '$scope': scopes.append(T[2])
+            elif T[0] == '$upscope': scopes.pop()
+            elif T[0] == '$var':
+                self.ids[T[3]] = len(self.widths)
+                self.widths.append(int(T[2]))
+                self.labels.append('.'.join(scopes + [T[4].split('[')[0]]))
+            elif T[0] == '$enddefinitions': break
+        # done
+        return
+
+    # generate the time steps: time and list of (identifier, value)
+    def steps(self):
+        time = 0
+        for line in self.fh:
+            T = line.split()
+            if not T: continue
+            # time
+            T, C = iter(T), []
+            t = next(T)
+            if t[0] == '#': time = int(t[1:])
+            else: T = chain([t], T)
+            # value changes
+            for t in T:
+                c = t[0]
+                # multiple bits
+                if c == 'b': C.append((next(T), t[1:]))
+                # single bit (skip $dumpoff, $dumpon and $end)
+                elif not c == '$': C.append((t[1:], c))
+            yield time, C
+        # done
+        return
+
+    # generate the value changes: time, identifier and value
+    def changes(self):
+        for time, C in self.steps():
+            for ident, value in C: yield time, ident, value
+        # done
+        return
+
+    def close(self):
+        self.fh.close()
+        # done
+        return
+
+######################################################################
+#                                                             VCD_DIFF
+######################################################################
+# the values shorter than the signal width are extended like GTKWave
+# does ('x' and 'z' are repeated, '0' otherwise)
+
+
+def _extend(value, width):
+    if value is None or len(value) >= width: return value
+    c = value[0] if value[0] in 'xXzZ' else LOW
+    return c * (width - len(value)) + value
+
+
+def vcd_diff(a, b):
+    ra, rb = vcd_reader(a), vcd_reader(b)
+    # match the identifiers of both files by label
+    la = {ra.labels[n]: i for i, n in ra.ids.items()}
+    lb = {rb.labels[n]: i for i, n in rb.ids.items()}
+    ab = {la[label]: lb[label] for label in la if label in lb}
+    ba = {j: i for i, j in ab.items()}
+    # the signals of one file only get None
+    D = {label: None for label in list(la) + list(lb)
+        if not (label in la and label in lb)}
+    # divergent signals (identifiers of the first file)
+    X = set()
+    def check(i, u, v):
+        if i in X or u == v: return
+        n = ra.ids[i]
+        w = ra.widths[n]
+        if _extend(u, w) == _extend(v, w): return
+        X.add(i)
+        D[ra.labels[n]] = t
+    # same identifiers: the identical steps are not compared
+    same = ab == {i: i for i in ab} and ab.keys() == ra.ids.keys() == rb.ids.keys()
+    # current values
+    VA, VB = {}, {}
+    SA, SB = ra.steps(), rb.steps()
+    sa, sb = next(SA, None), next(SB, None)
+    while sa or sb:
+        # next time step of both files
+        t = min([s[0] for s in (sa, sb) if s])
+        CA, CB = [], []
+        while sa and sa[0] == t:
+            CA += sa[1]
+            sa = next(SA, None)
+        while sb and sb[0] == t:
+            CB += sb[1]
+            sb = next(SB, None)
+        VA.update(CA)
+        VB.update(CB)
+        if same and CA == CB: continue
+        # compare the changed signals
+        for i, v in CA:
+            if i in ab: check(i, VA[i], VB.get(ab[i]))
+        for j, v in CB:
+            if j in ba: check(ba[j], VA.get(ba[j]), VB[j])
+    ra.close()
+    rb.close()
+    # done
+    return D
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from sys import argv
+
+    # compare two files
+    if len(argv) > 2:
+        D = vcd_diff(argv[1], argv[2])
+        for label, t in sorted(D.items(), key = lambda x: (x[1] or 0, x[0])):
+            if t is None: print(f"{label}: missing")
+            else: print(f"{label}: first divergence at #{t:04}")
+        if not D: print("no divergence")
+        exit(1 if D else 0)
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+
+    # inline and background writers
+    for fp, depth in [("./export.vcd.gz", None), ("./thread.vcd.gz", 64)]:
+        ls = logic_system()
+        clk = ls.add(clock(name = "clock"))
+        rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+        cnt = ls.add(counter(8, name = "counter"))
+        cnt.add_clk(clk.Q)
+        cnt.add_clr(rst.Q)
+        ls.open(fp, depth = depth)
+        ls.run_until(10000)
+        ls.close()
+        fh = ls.fh if depth is None else ls.fh.fh
+        print(f"{fh.position} characters in {fh.writes} writes")
+    # both files are the same
+    print(vcd_diff("./export.vcd.gz", "./thread.vcd.gz"))
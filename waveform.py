@@ -0,0 +1,464 @@
+# file: waveform.py
+# content: indexed binary waveform files
+# created: 2026 October 17 Saturday
+# author: Roch Schanen
+
+'''
+    the waveform file is a compact binary alternative to the VCD
+    file. it is written by the logic system when the export file
+    path ends with ".wave" and contains:
+
+    - the VCD header (the signal definitions)
+    - the blocks of value changes, each one compressed with zlib
+    - the index of the blocks and the export order of the signals
+
+    each block starts with the values of all the signals at the
+    start of the block, followed by the changes of each signal: the
+    time of each change is encoded as a difference with the previous
+    change of the same signal (delta encoding) and the values made
+    of 0 and 1 only are encoded as integers. all the integers are
+    variable length integers (7 bits per byte).
+
+    the reader finds the block of a given time in the index and only
+    reads and decompresses that block to get the value of a signal
+    at a time or its transitions within a time window. the values
+    are returned in the port state form (least significant bit
+    first) like logic_port.get().
+
+    the waveform file can be converted back into a VCD file (plain
+    or compressed) for GTKWave with wave_to_vcd().
+'''
+
+from toolbox import *
+from vcd import vcd_writer
+from zlib import compress, decompress
+from struct import pack, unpack
+from bisect import bisect_right
+
+# file signatures (local symbols)
+_MAGIC, _TAIL = b"SimSys wave 1\n", b"WAVE"
+
+# number of changes per block
+_LIMIT = 1 << 16
+
+######################################################################
+#                                                              VARINTS
+######################################################################
+
+
+def _put(B, n):
+    while n > 0x7F:
+        B.append(n & 0x7F | 0x80)
+        n >>= 7
+    B.append(n)
+    # done
+    return
+
+
+def _get(B, k):
+    n, s = 0, 0
+    while True:
+        b = B[k]
+        k += 1
+        n |= (b & 0x7F) << s
+        s += 7
+        if b < 0x80: return n, k
+
+
+def _put_value(B, value):
+    # values made of 0 and 1 only (the only digits of the states)
+    if value.isdigit():
+        _put(B, int(value, 2) << 1)
+        return
+    # any other value as text
+    _put(B, len(value) << 1 | 1)
+    B += value.encode('ascii')
+    # done
+    return
+
+
+def _get_value(B, k, width):
+    n, k = _get(B, k)
+    # text
+    if n & 1: return B[k:k + (n >> 1)].decode('ascii'), k + (n >> 1)
+    # 0 and 1 only
+    return f"{n >> 1:0{width}b}", k
+
+######################################################################
+#                                                               HEADER
+######################################################################
+# collect the signals from the VCD header: identifiers, widths and
+# labels in the order of definition
+
+
+def _parse_header(lines):
+    ids, widths, labels = {}, [], []
+    for line in lines:
+        T = line.split()
+        if not T or not T[0] == '$var': continue
+        ids[T[3]] = len(widths)
+        widths.append(int(T[2]))
+        labels.append(T[4])
+    # done
+    return ids, widths, labels
+
+######################################################################
+#                                                          WAVE_WRITER
+######################################################################
+# the writer receives the VCD text of the logic system and stores it
+# in binary form (any engine can write a waveform file).
+
+
+class wave_writer():
+
+    def __init__(self, fp, limit = _LIMIT):
+        # record file path
+        self.name = fp
+        self.fh = open(fp, 'wb')
+        # number of changes per block
+        self.limit = limit
+        # VCD header lines (None after the header)
+        self.header, self.tail = [], NUL
+        # signals
+        self.ids, self.widths, self.labels = {}, [], []
+        # export rank of each signal
+        self.ranks = {}
+        # values at the start of the current block
+        self.values = []
+        # changes of the current block: time and value by signal
+        self.changes, self.count = {}, 0
+        # time range of the current block
+        self.start, self.time = None, None
+        # blocks index
+        self.index = []
+        self.closed = False
+        # done
+        return
+
+    def write(self, text):
+        # split complete lines
+        L = (self.tail + text).split(EOL)
+        self.tail = L.pop()
+        for line in L:
+            # header
+            if self.header is not None:
+                self.header.append(line)
+                if line.startswith('$enddefinitions'): self.write_header()
+                continue
+            # changes
+            if line.startswith('#'): self.add_changes(line)
+        # done
+        return
+
+    def write_header(self):
+        # collect signals
+        self.ids, self.widths, self.labels = _parse_header(self.header)
+        self.values = [NUL] * len(self.widths)
+        # write header
+        text = (EOL.join(self.header) + EOL).encode('ascii')
+        self.fh.write(_MAGIC)
+        self.fh.write(pack('<Q', len(text)))
+        self.fh.write(text)
+        self.header = None
+        # done
+        return
+
+    def add_changes(self, line):
+        T = line.split()
+        t = int(T[0][1:])
+        # blocks end on a time step
+        if self.count >= self.limit: self.write_block()
+        if self.start is None: self.start = t
+        self.time = t
+        # collect changes
+        k = 1
+        while k < len(T):
+            # skip the dump commands ($dumpoff, $dumpon and $end)
+            if T[k][0] == '$':
+                k += 1
+                continue
+            # multiple bits
+            if T[k][0] == 'b':
+                value, ident = T[k][1:], T[k + 1]
+                k += 2
+            # single bit
+            else:
+                value, ident = T[k][0], T[k][1:]
+                k += 1
+            n = self.ids[ident]
+            if n not in self.ranks: self.ranks[n] = len(self.ranks)
+            if n not in self.changes: self.changes[n] = []
+            self.changes[n].append((t, value))
+            self.count += 1
+        # done
+        return
+
+    def write_block(self):
+        if self.start is None: return
+        B = bytearray()
+        # time range
+        _put(B, self.start)
+        _put(B, self.time)
+        # values at the start of the block
+        for v in self.values: _put_value(B, v)
+        # delta encoded changes of each signal
+        S = []
+        for n in sorted(self.changes):
+            C, t0 = bytearray(), self.start
+            for t, v in self.changes[n]:
+                _put(C, t - t0)
+                _put_value(C, v)
+                t0 = t
+            S.append((n, len(self.changes[n]), C))
+        # table of contents
+        _put(B, len(S))
+        for n, count, C in S:
+            _put(B, n)
+            _put(B, count)
+            _put(B, len(C))
+        for n, count, C in S: B += C
+        # write block
+        data = compress(bytes(B))
+        self.index.append((self.start, self.time, self.fh.tell(), len(data)))
+        self.fh.write(data)
+        # update values
+        for n, C in self.changes.items(): self.values[n] = C[-1][1]
+        # clear block
+        self.changes, self.count = {}, 0
+        self.start, self.time = None, None
+        # done
+        return
+
+    def flush(self):
+        self.fh.flush()
+        # done
+        return
+
+    def tell(self):
+        raise ValueError(f"{self.name}: waveform files can not be checkpointed")
+
+    def close(self):
+        if self.closed: return
+        # complete header
+        if self.header is not None: self.write_header()
+        # write last block
+        self.write_block()
+        # write index
+        B = bytearray()
+        _put(B, len(self.index))
+        for start, end, offset, size in self.index:
+            _put(B, start)
+            _put(B, end)
+            _put(B, offset)
+            _put(B, size)
+        # write export order
+        _put(B, len(self.ranks))
+        for n in self.ranks: _put(B, n)
+        offset = self.fh.tell()
+        self.fh.write(compress(bytes(B)))
+        self.fh.write(pack('<Q', offset))
+        self.fh.write(_TAIL)
+        self.fh.close()
+        self.closed = True
+        # done
+        return
+
+######################################################################
+#                                                          WAVE_READER
+######################################################################
+
+
+class wave_reader():
+
+    def __init__(self, fp):
+        # open file
+        self.name = fp
+        self.fh = open(fp, 'rb')
+        if not self.fh.read(len(_MAGIC)) == _MAGIC:
+            raise ValueError(f"{fp} is not a waveform file")
+        # read header
+        n, = unpack('<Q', self.fh.read(8))
+        self.header = self.fh.read(n).decode('ascii')
+        L = self.header.split(EOL)
+        self.ids, self.widths, self.labels = _parse_header(L)
+        self.idents = list(self.ids)
+        # read index
+        end = self.fh.seek(-12, 2)
+        offset, = unpack('<Q', self.fh.read(8))
+        if not self.fh.read(4) == _TAIL:
+            raise ValueError(f"{fp} is not a complete waveform file")
+        self.fh.seek(offset)
+        B = decompress(self.fh.read(end - offset))
+        n, k = _get(B, 0)
+        self.index = []
+        for j in range(n):
+            start, k = _get(B, k)
+            stop, k = _get(B, k)
+            position, k = _get(B, k)
+            size, k = _get(B, k)
+            self.index.append((start, stop, position, size))
+        self.starts = [start for start, stop, position, size in self.index]
+        # read export order
+        n, k = _get(B, k)
+        self.ranks = {}
+        for j in range(n):
+            s, k = _get(B, k)
+            self.ranks[s] = j
+        # last block read
+        self.cache = None, None
+        # done
+        return
+
+    ##################################################### SIGNALS
+
+    # find a signal from its identifier or its label (e.g. "counter_Q")
+    def signal(self, name):
+        if name in self.ids: return self.ids[name]
+        for n, label in enumerate(self.labels):
+            if name == label or name == label.split('[')[0]: return n
+        raise KeyError(f"signal {name} not found")
+
+    ##################################################### BLOCKS
+
+    def block(self, k):
+        # cached
+        if self.cache[0] == k: return self.cache[1]
+        # read block
+        start, stop, position, size = self.index[k]
+        self.fh.seek(position)
+        B = decompress(self.fh.read(size))
+        # read values at the start of the block
+        j, V = 0, []
+        start, j = _get(B, j)
+        stop, j = _get(B, j)
+        for w in self.widths:
+            v, j = _get_value(B, j, w)
+            V.append(v)
+        # read table of contents
+        n, j = _get(B, j)
+        T = []
+        for i in range(n):
+            s, j = _get(B, j)
+            count, j = _get(B, j)
+            size, j = _get(B, j)
+            T.append((s, count, size))
+        # locate the changes of each signal
+        S = {}
+        for s, count, size in T:
+            S[s] = j, count
+            j += size
+        self.cache = k, (start, V, S, B)
+        # done
+        return self.cache[1]
+
+    def changes(self, k, n):
+        start, V, S, B = self.block(k)
+        # unchanged signal
+        if n not in S: return V[n], []
+        # decode changes
+        (j, count), t, C = S[n], start, []
+        for i in range(count):
+            dt, j = _get(B, j)
+            v, j = _get_value(B, j, self.widths[n])
+            t += dt
+            C.append((t, v))
+        # done
+        return V[n], C
+
+    ##################################################### QUERIES
+
+    # value of a signal at time 't' (None before the first block)
+    def value(self, name, t):
+        n = self.signal(name)
+        k = bisect_right(self.starts, t) - 1
+        if k < 0: return None
+        v, C = self.changes(k, n)
+        for tc, vc in C:
+            if tc > t: break
+            v = vc
+        # done (port state form)
+        return v[::-1] if v else None
+
+    # transitions of a signal within the time window [t0, t1]
+    def transitions(self, name, t0, t1):
+        n = self.signal(name)
+        k0 = max(bisect_right(self.starts, t0) - 1, 0)
+        k1 = bisect_right(self.starts, t1)
+        T = []
+        for k in range(k0, k1):
+            v, C = self.changes(k, n)
+            T += [(t, v[::-1]) for t, v in C if t0 <= t <= t1]
+        # done
+        return T
+
+    ##################################################### CONVERSION
+
+    def to_vcd(self, fp):
+        fh = vcd_writer(fp)
+        fh.write(self.header)
+        # export order of the signals
+        rank = lambda n: self.ranks.get(n, len(self.ranks) + n)
+        for k in range(len(self.index)):
+            start, V, S, B = self.block(k)
+            # collect all the changes of the block
+            E = []
+            for n in S:
+                v, C = self.changes(k, n)
+                E += [(t, rank(n), n, v) for t, v in C]
+            E.sort()
+            # write time steps
+            line, time = NUL, None
+            for t, r, n, v in E:
+                if not t == time:
+                    if line: fh.write(f"{line}{EOL}")
+                    line, time = f"#{t:04}{SPC}", t
+                ident = self.idents[n]
+                if self.widths[n] > 1: line += f"b{v} {ident}{SPC}"
+                else: line += f"{v}{ident}{SPC}"
+            if line: fh.write(f"{line}{EOL}")
+        fh.close()
+        # done
+        return
+
+    def close(self):
+        self.fh.close()
+        # done
+        return
+
+######################################################################
+#                                                          WAVE_TO_VCD
+######################################################################
+
+
+def wave_to_vcd(src, dst):
+    fh = wave_reader(src)
+    fh.to_vcd(dst)
+    fh.close()
+    # done
+    return
+
+######################################################################
+#                                                                 TEST
+######################################################################
+
+if __name__ == "__main__":
+
+    from core import logic_system
+    from clock import clock
+    from counter import counter
+
+    ls = logic_system()
+    clk = ls.add(clock(name = "clock"))
+    rst = ls.add(clock(40, 35, 5, 1, name = "reset"))
+    cnt = ls.add(counter(8, name = "counter"))
+    cnt.add_clk(clk.Q)
+    cnt.add_clr(rst.Q)
+    ls.open("./export.wave")
+    ls.run_until(100000)
+    ls.close()
+
+    fh = wave_reader("./export.wave")
+    print(fh.value("counter_Q", 50000))
+    print(fh.transitions("counter_Q", 1000, 1100))
+    fh.close()
+    wave_to_vcd("./export.wave", "./export.vcd")